@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Bankroll allocation across recommended PrizePicks entries.
+
+Builds candidate entries from the qualifying opportunities, prices each one
+from its legs' no-vig win probabilities and payout table, and sizes stakes
+with fractional Kelly under exposure caps (total, per entry, per player and
+per game). Legs shared between entries make their returns correlated; that
+covariance is accounted for, so overlapping entries aren't double-staked.
+
+Usage: python allocation.py --bankroll 500 [--snapshot data/opportunities.json]
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+
+from analysis import BET_TYPES
+from snapshot import DATA_FILE
+
+# Fraction of full Kelly to stake (full Kelly is far too aggressive given
+# how noisy the win probability estimates are)
+KELLY_FRACTION = 0.25
+
+# Exposure caps as fractions of the bankroll
+DEFAULT_LIMITS = {
+    'total': 0.25,
+    'entry': 0.03,
+    'player': 0.06,
+    'game': 0.10,
+}
+
+# Candidate entries built per bet type
+MAX_ENTRIES_PER_TYPE = 50
+
+# Coordinate ascent stops once a full sweep improves the objective by less than
+# this fraction of its value
+SOLVER_TOLERANCE = 1e-6
+MAX_SWEEPS = 500
+
+# Stakes and gradient gaps below this are treated as zero
+_EPSILON = 1e-12
+
+
+def hit_distribution(probs):
+    """P(k legs hit) for independent legs (Poisson-binomial), k = 0..len(probs)."""
+    dist = [1.0]
+    for p in probs:
+        nxt = [0.0] * (len(dist) + 1)
+        for k, q in enumerate(dist):
+            nxt[k] += q * (1 - p)
+            nxt[k + 1] += q * p
+        dist = nxt
+    return dist
+
+
+def leg_key(opp):
+    return (opp['player'], opp['stat'], opp['line'], opp['direction'])
+
+
+def build_candidate_entries(opportunities, bet_types=None, max_per_type=MAX_ENTRIES_PER_TYPE):
+    """
+    Candidate entries from dashboard-format opportunities.
+
+    For each bet type, the picks that qualify for it are taken best edge
+    first and every window of `picks` consecutive picks (distinct players)
+    becomes a candidate, so neighbouring candidates share legs. A pick's
+    game is its 'event' (set for props matched to a PrizePicks game).
+    Returns a list of {'bet_type', 'legs': [{player, stat, line, direction,
+    event, p}]}.
+    """
+    bet_types = BET_TYPES if bet_types is None else bet_types
+    by_type = {bet_type: [] for bet_type in bet_types}
+    for opp in opportunities:
+        for bet in opp.get('all_qualifying_bets', ()):
+            if bet['type'] in by_type:
+                by_type[bet['type']].append((bet['edge'], opp))
+
+    entries = []
+    for bet_type, picks in by_type.items():
+        size = bet_types[bet_type]['picks']
+        picks.sort(key=lambda item: -item[0])
+        legs = [opp for _, opp in picks]
+        seen = set()
+        for start in range(len(legs)):
+            if len(seen) >= max_per_type:
+                break
+            window, players = [], set()
+            for opp in legs[start:]:
+                if opp['player'] not in players:
+                    window.append(opp)
+                    players.add(opp['player'])
+                    if len(window) == size:
+                        break
+            if len(window) < size:
+                break
+            keys = frozenset(leg_key(opp) for opp in window)
+            if keys in seen:
+                continue
+            seen.add(keys)
+            entries.append({
+                'bet_type': bet_type,
+                'legs': [
+                    {
+                        'player': opp['player'],
+                        'stat': opp['stat'],
+                        'line': opp['line'],
+                        'direction': opp['direction'],
+                        'event': opp.get('event'),
+                        'p': opp['no_vig_win_pct'] / 100,
+                    }
+                    for opp in window
+                ],
+            })
+    return entries
+
+
+def _payout_vector(bet_info):
+    return [bet_info['payouts'].get(hits, 0) for hits in range(bet_info['picks'] + 1)]
+
+
+def _conditional_returns(payouts, legs, shared):
+    """E[return - 1 | h of the `shared` legs hit], for h = 0..len(shared)."""
+    rest = hit_distribution([leg['p'] for leg in legs if leg_key(leg) not in shared])
+    return [
+        sum(q * payouts[k + h] for k, q in enumerate(rest)) - 1
+        for h in range(len(shared) + 1)
+    ]
+
+
+def entry_moments(entries, bet_types=None):
+    """
+    Expected net return per unit staked (mu) and the covariance of returns.
+
+    Entries are independent unless they share legs. For a pair sharing legs
+    S, both returns are conditioned on how many of S hit:
+    E[Ri Rj] = sum_h P(h of S hit) E[Ri | h] E[Rj | h]. Returns
+    (mu, variance, covariance) where covariance is {i: {j: cov}} holding
+    only the nonzero off-diagonal terms.
+    """
+    bet_types = BET_TYPES if bet_types is None else bet_types
+    payouts = [_payout_vector(bet_types[entry['bet_type']]) for entry in entries]
+
+    mu, variance = [], []
+    for entry, table in zip(entries, payouts):
+        dist = hit_distribution([leg['p'] for leg in entry['legs']])
+        mean = sum(q * m for q, m in zip(dist, table)) - 1
+        mu.append(mean)
+        variance.append(sum(q * (m - 1) ** 2 for q, m in zip(dist, table)) - mean ** 2)
+
+    entries_by_leg = {}
+    for i, entry in enumerate(entries):
+        for leg in entry['legs']:
+            entries_by_leg.setdefault(leg_key(leg), []).append(i)
+
+    shared_legs = {}
+    for key, members in entries_by_leg.items():
+        for a in range(len(members)):
+            for b in range(a + 1, len(members)):
+                shared_legs.setdefault((members[a], members[b]), []).append(key)
+
+    probs = {leg_key(leg): leg['p'] for entry in entries for leg in entry['legs']}
+    conditional = {}  # (entry, shared legs) -> E[R | h shared hits]
+    covariance = {i: {} for i in range(len(entries))}
+    for (i, j), keys in shared_legs.items():
+        shared = frozenset(keys)
+        for k in (i, j):
+            if (k, shared) not in conditional:
+                conditional[k, shared] = _conditional_returns(payouts[k], entries[k]['legs'], shared)
+        shared_dist = hit_distribution([probs[key] for key in keys])
+        cross = sum(
+            q * ri * rj
+            for q, ri, rj in zip(shared_dist, conditional[i, shared], conditional[j, shared])
+        )
+        cov = cross - mu[i] * mu[j]
+        covariance[i][j] = cov
+        covariance[j][i] = cov
+    return mu, variance, covariance
+
+
+def allocate(entries, bankroll, kelly_fraction=KELLY_FRACTION, limits=None, bet_types=None,
+             tolerance=SOLVER_TOLERANCE, max_sweeps=MAX_SWEEPS):
+    """
+    Fractional-Kelly stakes for a set of candidate entries.
+
+    Maximizes the quadratic approximation of expected log growth,
+    mu.f - (1 / 2k) f.(Cov + mu mu^T).f with k the Kelly fraction, over
+    stakes f (as fractions of the bankroll) subject to f >= 0 and the
+    exposure caps in `limits`. Solved by projected coordinate ascent: each
+    stake in turn moves to its best value given the others, clipped to what
+    its caps leave. Where a cap binds, stake is then shifted inside that
+    group from its lowest-gradient entries to its highest (exact line search
+    per pair), so a full total/player/game cap doesn't freeze whichever
+    entries happened to fill it first. Sweeps stop once one improves the
+    objective by less than `tolerance` (relative).
+    Gradients are kept up to date incrementally (only nonzero covariances
+    are touched, and the rank-one mu mu^T term is a running sum). Entries
+    with no positive edge are never staked.
+
+    Returns {'entries': [... with 'stake', 'expected_return', 'win_prob'],
+    'candidates', 'total_stake', 'expected_profit', 'expected_log_growth',
+    'sweeps', 'solve_seconds'}.
+    """
+    start = time.perf_counter()
+    limits = dict(DEFAULT_LIMITS, **(limits or {}))
+    bet_types = BET_TYPES if bet_types is None else bet_types
+    mu, variance, covariance = entry_moments(entries, bet_types)
+    n = len(entries)
+    k = kelly_fraction
+    entry_cap = limits['entry']
+
+    # Exposure groups each entry counts against (once per player / game)
+    groups = []
+    caps = {('total',): limits['total']}
+    for entry in entries:
+        member_of = [('total',)]
+        for player in {leg['player'] for leg in entry['legs']}:
+            member_of.append(('player', player))
+            caps[('player', player)] = limits['player']
+        for game in {leg.get('event') for leg in entry['legs']} - {None}:
+            member_of.append(('game', game))
+            caps[('game', game)] = limits['game']
+        groups.append(member_of)
+    used = {group: 0.0 for group in caps}
+    active = [i for i in range(n) if mu[i] > 0]
+    members = {group: [] for group in caps}
+    for i in active:
+        for group in groups[i]:
+            members[group].append(i)
+
+    f = [0.0] * n
+    cov_f = [0.0] * n  # (Cov f)_i
+    state = {'s': 0.0}  # mu . f
+
+    def gradient(i):
+        return mu[i] - (cov_f[i] + mu[i] * state['s']) / k
+
+    def move(i, delta):
+        f[i] += delta
+        state['s'] += mu[i] * delta
+        cov_f[i] += variance[i] * delta
+        for j, cov in covariance[i].items():
+            cov_f[j] += cov * delta
+        for group in groups[i]:
+            used[group] += delta
+
+    def headroom(i, skip=()):
+        return min((caps[g] - used[g] for g in groups[i] if g not in skip), default=float('inf'))
+
+    def objective():
+        return state['s'] - (sum(f[i] * cov_f[i] for i in active) + state['s'] ** 2) / (2 * k)
+
+    value = 0.0
+    sweeps = 0
+    for sweeps in range(1, max_sweeps + 1):
+        for i in active:
+            curvature = (variance[i] + mu[i] * mu[i]) / k
+            upper = min(entry_cap, f[i] + max(headroom(i), 0.0))
+            target = min(max(f[i] + gradient(i) / curvature, 0.0), upper)
+            if target != f[i]:
+                move(i, target - f[i])
+
+        for group, group_members in members.items():
+            # Binding caps, plus the total every sweep: swapping stake between
+            # near-duplicate entries is the direction single steps zig-zag along
+            if group != ('total',) and caps[group] - used[group] > _EPSILON:
+                continue
+            # Walk the group from both ends of the gradient order, moving stake
+            # from the lowest-gradient entries to the highest
+            ranked = sorted(group_members, key=gradient)
+            low, high = 0, len(ranked) - 1
+            while low < high:
+                down, up = ranked[low], ranked[high]
+                if f[down] <= _EPSILON:
+                    low += 1
+                    continue
+                room = min(entry_cap - f[up], headroom(up, (group,)))
+                if room <= _EPSILON:
+                    high -= 1
+                    continue
+                gap = gradient(up) - gradient(down)
+                if gap <= _EPSILON:
+                    break
+                pair_cov = covariance[up].get(down, 0.0) + mu[up] * mu[down]
+                curvature = (variance[up] + mu[up] ** 2 + variance[down] + mu[down] ** 2 - 2 * pair_cov) / k
+                step = gap / curvature if curvature > _EPSILON else float('inf')
+                delta = min(step, f[down], room)
+                move(down, -delta)
+                move(up, delta)
+                if f[down] <= _EPSILON:
+                    low += 1
+                else:
+                    high -= 1
+
+        previous, value = value, objective()
+        if value - previous < tolerance * abs(value):
+            break
+
+    allocated = []
+    for i, entry in enumerate(entries):
+        stake = math.floor(f[i] * bankroll * 100) / 100  # Round down so caps hold
+        if stake <= 0:
+            continue
+        table = _payout_vector(bet_types[entry['bet_type']])
+        dist = hit_distribution([leg['p'] for leg in entry['legs']])
+        allocated.append(dict(
+            entry,
+            stake=stake,
+            expected_return=round(mu[i] * 100, 2),
+            win_prob=round(sum(q for q, m in zip(dist, table) if m > 1) * 100, 2),
+        ))
+    allocated.sort(key=lambda e: -e['stake'])
+
+    # Quadratic approximation of E[log(bankroll growth)] at these stakes (full Kelly scale)
+    log_growth = state['s'] - (sum(f[i] * cov_f[i] for i in active) + state['s'] ** 2) / 2
+
+    return {
+        'entries': allocated,
+        'candidates': n,
+        'total_stake': round(sum(e['stake'] for e in allocated), 2),
+        'expected_profit': round(sum(e['stake'] * e['expected_return'] / 100 for e in allocated), 2),
+        'expected_log_growth': round(log_growth, 6),
+        'sweeps': sweeps,
+        'solve_seconds': round(time.perf_counter() - start, 4),
+    }
+
+
+def print_allocation(result, bankroll):
+    print("\n" + "="*80)
+    print(f"🏦 STAKES FOR A ${bankroll:,.2f} BANKROLL ({KELLY_FRACTION:g} Kelly)")
+    print("="*80)
+    if not result['entries']:
+        print("\n❌ No entry has a positive expected return.")
+        return
+    for entry in result['entries']:
+        print(f"\n💵 ${entry['stake']:.2f} on {entry['bet_type']} "
+              f"(EV {entry['expected_return']:+.2f}%, profits {entry['win_prob']:.1f}% of the time)")
+        for leg in entry['legs']:
+            print(f"   • {leg['player']} {leg['direction'].title()} {leg['line']} {leg['stat']} ({leg['p'] * 100:.1f}%)")
+    print(f"\n📊 Total staked: ${result['total_stake']:.2f} across {len(result['entries'])} of "
+          f"{result['candidates']} candidate entries, expected profit ${result['expected_profit']:.2f} "
+          f"(solved in {result['solve_seconds'] * 1000:.0f} ms)\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Size PrizePicks entries with fractional Kelly")
+    parser.add_argument("--bankroll", type=float, required=True, help="bankroll in dollars")
+    parser.add_argument("--snapshot", default=str(DATA_FILE), help="dashboard snapshot to allocate from")
+    args = parser.parse_args()
+
+    try:
+        with open(args.snapshot, 'r') as f:
+            opportunities = json.load(f)['opportunities']
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Could not read opportunities from {args.snapshot}: {e}")
+        sys.exit(1)
+
+    entries = build_candidate_entries(opportunities)
+    print_allocation(allocate(entries, args.bankroll), args.bankroll)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+# analysis.py
+"""
+Pricing and +EV analysis core: odds conversion, bet type thresholds and
+opportunity formatting. Standard library only, so cron runs, tests and the
+scrapers can import it without pulling in FastAPI or Playwright.
+"""
+
+import bisect
+import json
+import os
+from datetime import datetime
+from math import comb, isfinite
+
+from odds_math import no_vig_probabilities
+
+
+# PrizePicks payout structures and minimum win % thresholds.
+# "payouts" maps number of correct picks -> multiplier; min_win_pct is the
+# per-pick win rate at which that table breaks even.
+BET_TYPES = {
+    "2-Pick Power": {"payout": 3, "min_win_pct": 57.74, "type": "power", "picks": 2, "payouts": {2: 3}},
+    "3-Pick Power": {"payout": 6, "min_win_pct": 55.05, "type": "power", "picks": 3, "payouts": {3: 6}},
+    "4-Pick Power": {"payout": 10, "min_win_pct": 56.23, "type": "power", "picks": 4, "payouts": {4: 10}},
+    "5-Pick Power": {"payout": 20, "min_win_pct": 54.93, "type": "power", "picks": 5, "payouts": {5: 20}},
+    "6-Pick Power": {"payout": 37.5, "min_win_pct": 54.66, "type": "power", "picks": 6, "payouts": {6: 37.5}},
+    "3-Pick Flex": {"payout": 3, "min_win_pct": 57.74, "type": "flex", "picks": 3, "payouts": {3: 3, 2: 1}},
+    "4-Pick Flex": {"payout": 6, "min_win_pct": 55.04, "type": "flex", "picks": 4, "payouts": {4: 6, 3: 1.5}},
+    "5-Pick Flex": {"payout": 10, "min_win_pct": 54.26, "type": "flex", "picks": 5, "payouts": {5: 10, 4: 2, 3: 0.4}},
+    "6-Pick Flex": {"payout": 25, "min_win_pct": 54.21, "type": "flex", "picks": 6, "payouts": {6: 25, 5: 2, 4: 0.4}},
+}
+
+# Point this at a JSON file to replace BET_TYPES with your own payout tables
+BET_TYPES_CONFIG_ENV = "PROPSHOP_BET_TYPES"
+
+def breakeven_win_pct(picks, payouts):
+    """
+    Per-pick win % at which an entry with this payout table has zero EV,
+    assuming independent picks. Solved by bisection.
+    """
+    def expected_return(p):
+        return sum(
+            comb(picks, hits) * p ** hits * (1 - p) ** (picks - hits) * multiplier
+            for hits, multiplier in payouts.items()
+        )
+    
+    low, high = 0.0, 1.0
+    for _ in range(60):
+        mid = (low + high) / 2
+        if expected_return(mid) < 1:
+            low = mid
+        else:
+            high = mid
+    return round(high * 100, 2)
+
+def load_bet_types(path):
+    """
+    Load user-defined bet types from JSON, in the same shape as BET_TYPES.
+    Every entry needs "payouts" (picks defaults to the largest hit count),
+    since backtest.py and allocation.py settle entries from the payout table.
+    min_win_pct is derived from the payouts when left out.
+    """
+    with open(path, 'r') as f:
+        raw = json.load(f)
+    
+    bet_types = {}
+    for bet_name, bet_info in raw.items():
+        bet_info = dict(bet_info)
+        if not bet_info.get('payouts'):
+            raise ValueError(f"Bet type {bet_name!r} needs a payouts table (correct picks -> multiplier)")
+        bet_info['payouts'] = {int(hits): float(mult) for hits, mult in bet_info['payouts'].items()}
+        bet_info['picks'] = int(bet_info.get('picks', max(bet_info['payouts'])))
+        bet_info.setdefault('payout', max(bet_info['payouts'].values()))
+        if any(hits < 0 or hits > bet_info['picks'] for hits in bet_info['payouts']):
+            raise ValueError(f"Bet type {bet_name!r} pays for more correct picks than its {bet_info['picks']} picks")
+        if 'min_win_pct' not in bet_info:
+            bet_info['min_win_pct'] = breakeven_win_pct(bet_info['picks'], bet_info['payouts'])
+        bet_types[bet_name] = bet_info
+    return bet_types
+
+def build_threshold_table(bet_types):
+    """
+    Sort bet types by min_win_pct (ties keep their BET_TYPES order).
+    Returns (thresholds, entries) where thresholds is ascending, so the bet
+    types a win % qualifies for are always a prefix -- and because
+    edge = win % - threshold, that prefix is already sorted best edge first.
+    """
+    ordered = sorted(
+        enumerate(bet_types.items()),
+        key=lambda item: (item[1][1]['min_win_pct'], item[0])
+    )
+    thresholds = [bet_info['min_win_pct'] for _, (_, bet_info) in ordered]
+    entries = [(bet_name, bet_info['min_win_pct'], bet_info['payout']) for _, (bet_name, bet_info) in ordered]
+    return thresholds, entries
+
+if os.environ.get(BET_TYPES_CONFIG_ENV):
+    BET_TYPES = load_bet_types(os.environ[BET_TYPES_CONFIG_ENV])
+
+BET_TYPE_TABLE = build_threshold_table(BET_TYPES)
+
+def qualifying_bets(win_pct, table=None):
+    """
+    Bet types a pick with this no-vig win % qualifies for, best edge first.
+    """
+    thresholds, entries = table or BET_TYPE_TABLE
+    cutoff = bisect.bisect_right(thresholds, win_pct)
+    if not cutoff:
+        return []
+    return [
+        {'bet_type': bet_name, 'edge': win_pct - threshold, 'payout': payout}
+        for bet_name, threshold, payout in entries[:cutoff]
+    ]
+
+def american_to_probability(odds):
+    """Convert American odds to implied probability percentage."""
+    if odds > 0:
+        return 100 / (odds + 100) * 100
+    else:
+        return abs(odds) / (abs(odds) + 100) * 100
+
+def calculate_no_vig_probability(over_odds, under_odds):
+    """
+    Calculate the true (no-vig) probability from FanDuel's Over/Under odds.
+    Removes the bookmaker's vig to get fair market probability.
+    """
+    over_prob = american_to_probability(over_odds)
+    under_prob = american_to_probability(under_odds)
+    total_prob = over_prob + under_prob
+    
+    # Remove vig and normalize
+    no_vig_over = (over_prob / total_prob) * 100
+    no_vig_under = (under_prob / total_prob) * 100
+    
+    return no_vig_over, no_vig_under
+
+def find_plus_ev_opportunities(fanduel_odds, bet_types=None):
+    """
+    Analyze FanDuel odds to find +EV opportunities for PrizePicks.
+    Returns a dict of player -> [{prop info, recommended bets}]
+    
+    over_qualifies/under_qualifies are sorted by edge, best first.
+    Pass `bet_types` to analyze against a payout table other than BET_TYPES.
+    """
+    table = build_threshold_table(bet_types) if bet_types is not None else BET_TYPE_TABLE
+    opportunities = {}
+    
+    # Price every prop on the slate in one batch; iteration order below matches
+    all_props = [prop for props in fanduel_odds.values() for prop in props]
+    no_vig_overs, no_vig_unders = no_vig_probabilities(
+        [prop['over_odds'] for prop in all_props],
+        [prop['under_odds'] for prop in all_props],
+    )
+    position = 0
+    
+    for player, props in fanduel_odds.items():
+        player_opps = []
+        
+        for prop in props:
+            stat = prop['stat']
+            line = prop['line']
+            over_odds = prop['over_odds']
+            under_odds = prop['under_odds']
+            no_vig_over = no_vig_overs[position]
+            no_vig_under = no_vig_unders[position]
+            position += 1
+            
+            # Check which bet types this prop qualifies for
+            over_qualifies = qualifying_bets(no_vig_over, table)
+            under_qualifies = qualifying_bets(no_vig_under, table)
+            
+            if over_qualifies or under_qualifies:
+                player_opps.append({
+                    'stat': stat,
+                    'line': line,
+                    'event': prop.get('event'),
+                    'over_odds': over_odds,
+                    'under_odds': under_odds,
+                    'no_vig_over': no_vig_over,
+                    'no_vig_under': no_vig_under,
+                    'over_qualifies': over_qualifies,
+                    'under_qualifies': under_qualifies
+                })
+        
+        if player_opps:
+            opportunities[player] = player_opps
+    
+    return opportunities
+
+# Field order for rows given as arrays: [player, stat, line, over_odds, under_odds]
+PROP_ROW_FIELDS = ('player', 'stat', 'line', 'over_odds', 'under_odds')
+
+# Longest JSON-encoded prop row accepted (streamed NDJSON lines are cut here)
+MAX_PROP_ROW_BYTES = 64 * 1024
+
+def _finite_float(value, what):
+    """float(value); NaN, infinities and numbers too large for a float raise ValueError."""
+    try:
+        number = float(value)
+    except OverflowError:
+        number = float('inf')
+    if not isfinite(number):
+        raise ValueError(f"invalid {what}: {value!r}")
+    return number
+
+def parse_american_odds(value):
+    """Coerce scraped/user odds ("-136", "+110", 120.0) to an int; raises ValueError."""
+    if isinstance(value, str):
+        value = value.strip().replace('\u2212', '-')  # FanDuel renders a Unicode minus
+    odds = int(_finite_float(value, "American odds"))
+    if -100 < odds < 100:
+        raise ValueError(f"invalid American odds: {value!r}")
+    return odds
+
+def parse_prop_row(row):
+    """
+    Normalize one user-supplied prop: a dict with PROP_ROW_FIELDS keys, an
+    array in that order, or a JSON-encoded line of either (at most
+    MAX_PROP_ROW_BYTES long). Raises ValueError/KeyError/TypeError on bad
+    input, including a line or odds that aren't finite numbers.
+    """
+    if isinstance(row, (bytes, str)):
+        if len(row) > MAX_PROP_ROW_BYTES:
+            raise ValueError(f"row is longer than {MAX_PROP_ROW_BYTES} bytes")
+        row = json.loads(row)
+    if isinstance(row, (list, tuple)):
+        if len(row) != len(PROP_ROW_FIELDS):
+            raise ValueError(f"expected {len(PROP_ROW_FIELDS)} fields, got {len(row)}")
+        row = dict(zip(PROP_ROW_FIELDS, row))
+    return {
+        'player': str(row['player']),
+        'stat': str(row['stat']),
+        'line': _finite_float(row['line'], "line"),
+        'over_odds': parse_american_odds(row['over_odds']),
+        'under_odds': parse_american_odds(row['under_odds']),
+    }
+
+def evaluate_props(rows, start_index=0, table=None):
+    """
+    Evaluate raw prop rows one at a time (generator, so callers can chunk and
+    stream). Yields the same fields find_plus_ev_opportunities produces per
+    prop plus 'row' (position in the input); rows that can't be parsed yield
+    {'row', 'error'} instead of stopping the batch.
+    """
+    table = table or BET_TYPE_TABLE
+    for index, row in enumerate(rows, start_index):
+        try:
+            prop = parse_prop_row(row)
+        except (ValueError, KeyError, TypeError) as e:
+            yield {'row': index, 'error': f"{e.__class__.__name__}: {e}"}
+            continue
+        
+        no_vig_over, no_vig_under = calculate_no_vig_probability(prop['over_odds'], prop['under_odds'])
+        prop['row'] = index
+        prop['no_vig_over'] = no_vig_over
+        prop['no_vig_under'] = no_vig_under
+        prop['over_qualifies'] = qualifying_bets(no_vig_over, table)
+        prop['under_qualifies'] = qualifying_bets(no_vig_under, table)
+        yield prop
+
+def format_opportunities_for_dashboard(opportunities_dict, fanduel_odds):
+    """
+    Convert opportunities dict to dashboard-friendly JSON format.
+    """
+    formatted_opps = []
+    opp_id = 1
+    
+    for player, props in opportunities_dict.items():
+        for prop in props:
+            # Determine best direction (Over or Under); qualifies lists are best-first
+            best_over = prop['over_qualifies'][0] if prop['over_qualifies'] else None
+            best_under = prop['under_qualifies'][0] if prop['under_qualifies'] else None
+            
+            if best_over and (not best_under or best_over['edge'] >= best_under['edge']):
+                direction = 'over'
+                best_bet = best_over
+                all_qualifies = prop['over_qualifies']
+                win_pct = prop['no_vig_over']
+            else:
+                direction = 'under'
+                best_bet = best_under
+                all_qualifies = prop['under_qualifies']
+                win_pct = prop['no_vig_under']
+            
+            # Determine sport from stat type (simple heuristic)
+            stat_lower = prop['stat'].lower()
+            if any(term in stat_lower for term in ['passing', 'rushing', 'receiving', 'touchdown']):
+                sport = 'NFL'
+            elif any(term in stat_lower for term in ['points', 'rebounds', 'assists', '3-pointers', 'blocks', 'steals']):
+                sport = 'NBA'
+            elif any(term in stat_lower for term in ['goals', 'saves', 'shots']):
+                sport = 'NHL'
+            elif any(term in stat_lower for term in ['strikeouts', 'hits', 'runs', 'home runs']):
+                sport = 'MLB'
+            else:
+                sport = 'Other'
+            
+            formatted_opps.append({
+                'id': opp_id,
+                'player': player,
+                'sport': sport,
+                'stat': prop['stat'],
+                'line': prop['line'],
+                'event': prop.get('event'),
+                'direction': direction,
+                'odds': prop['over_odds'] if direction == 'over' else prop['under_odds'],
+                'no_vig_win_pct': round(win_pct, 2),
+                'edge': round(best_bet['edge'], 2),
+                'best_bet_type': best_bet['bet_type'],
+                'payout': best_bet['payout'],
+                'all_qualifying_bets': [
+                    {
+                        'type': q['bet_type'],
+                        'edge': round(q['edge'], 2),
+                        'payout': q['payout']
+                    } for q in all_qualifies
+                ]
+            })
+            opp_id += 1
+    
+    # Calculate stats
+    total_props_scanned = sum(len(props) for props in fanduel_odds.values())
+    total_plus_ev = len(formatted_opps)
+    avg_edge = sum(opp['edge'] for opp in formatted_opps) / total_plus_ev if total_plus_ev > 0 else 0
+    best_edge = max((opp['edge'] for opp in formatted_opps), default=0)
+    
+    return {
+        'opportunities': formatted_opps,
+        'stats': {
+            'total_scanned': total_props_scanned,
+            'plus_ev_found': total_plus_ev,
+            'conversion_rate': round((total_plus_ev / total_props_scanned * 100), 2) if total_props_scanned > 0 else 0,
+            'avg_edge': round(avg_edge, 2),
+            'best_edge': round(best_edge, 2)
+        },
+        'last_updated': datetime.utcnow().isoformat() + 'Z',
+        'date': datetime.now().strftime('%Y-%m-%d')
+    }
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Backtest the +EV recommendations against settled results.
+
+Replays the daily snapshots archived by daily_scraper (data/snapshots/<date>.json)
+against a results file of actual stat lines, builds the recommended PrizePicks
+entries for each day and pays them from the BET_TYPES payout tables. Reports
+ROI, hit rate, and how well the no-vig win % was calibrated by edge bucket.
+
+Results file: CSV with columns date,player,stat,value (or JSONL with the same
+keys). A player/stat with no row for that date (DNP, not settled) voids the leg.
+
+Usage: python backtest.py --results data/results.csv [--since 2026-01-01] [--until 2026-03-31]
+"""
+
+import argparse
+import csv
+import json
+import sys
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+
+from analysis import BET_TYPES
+from name_index import normalize_name
+from snapshot import SNAPSHOT_DIR
+
+# Lower bounds of the edge buckets used for calibration (percentage points)
+EDGE_BUCKETS = [0, 1, 2, 3, 5]
+
+# Leg outcomes
+HIT, MISS, VOID = 1, 0, -1
+
+
+def load_results(path):
+    """Return {(date, normalized player, stat): value} from a CSV or JSONL file."""
+    path = Path(path)
+    results = {}
+    with open(path, 'r', newline='') as f:
+        if path.suffix in ('.jsonl', '.ndjson'):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        names = {}
+        for row in rows:
+            value = row.get('value')
+            if value in (None, ''):
+                continue
+            player = row['player']
+            key = names.get(player)
+            if key is None:
+                key = names[player] = normalize_name(player)
+            results[(row['date'], key, row['stat'].strip().lower())] = float(value)
+    return results
+
+
+def snapshot_paths(directory=SNAPSHOT_DIR, since=None, until=None):
+    """Archived snapshots in date order, optionally limited to [since, until]."""
+    paths = sorted(Path(directory).glob('*.json'))
+    return [
+        p for p in paths
+        if (since is None or p.stem >= since) and (until is None or p.stem <= until)
+    ]
+
+
+def load_legs(paths):
+    """
+    Flatten snapshots into columns, one entry per recommended pick.
+
+    Returns a dict of parallel columns: date, player, player_key, stat_key,
+    bet_type (lists) and line, over (1/0), win_pct, edge (arrays).
+    """
+    legs = {
+        'date': [], 'player': [], 'player_key': [], 'stat_key': [], 'bet_type': [],
+        'line': array('d'), 'over': array('b'), 'win_pct': array('d'), 'edge': array('d'),
+    }
+    names = {}
+    for path in paths:
+        with open(path, 'r') as f:
+            snapshot = json.load(f)
+        date = snapshot.get('date') or Path(path).stem
+        opportunities = snapshot.get('opportunities', [])
+        legs['date'].extend([date] * len(opportunities))
+        for opp in opportunities:
+            player = opp['player']
+            key = names.get(player)
+            if key is None:
+                key = names[player] = normalize_name(player)
+            legs['player'].append(player)
+            legs['player_key'].append(key)
+        legs['stat_key'].extend(opp['stat'].strip().lower() for opp in opportunities)
+        legs['bet_type'].extend(opp['best_bet_type'] for opp in opportunities)
+        legs['line'].extend(float(opp['line']) for opp in opportunities)
+        legs['over'].extend(1 if opp['direction'] == 'over' else 0 for opp in opportunities)
+        legs['win_pct'].extend(opp['no_vig_win_pct'] for opp in opportunities)
+        legs['edge'].extend(opp['edge'] for opp in opportunities)
+    return legs
+
+
+def grade_legs(legs, results):
+    """Outcome of every leg (HIT, MISS or VOID for pushes and missing results)."""
+    values = map(results.get, zip(legs['date'], legs['player_key'], legs['stat_key']))
+    return array('b', (
+        VOID if value is None or value == line
+        else HIT if (value > line) == bool(over)
+        else MISS
+        for value, line, over in zip(values, legs['line'], legs['over'])
+    ))
+
+
+def build_entries(legs, bet_types=None):
+    """
+    Group each day's picks into the entries they were recommended for.
+
+    Picks sharing a date and best bet type are taken best edge first and
+    dealt into entries of that type's size, one pick per player per entry.
+    Leftover picks that can't fill an entry are not bet. Returns a list of
+    (bet_type, [leg indexes]).
+    """
+    bet_types = BET_TYPES if bet_types is None else bet_types
+    edge = legs['edge']
+    order = sorted(
+        (i for i, bet_type in enumerate(legs['bet_type']) if bet_type in bet_types),
+        key=lambda i: (legs['date'][i], legs['bet_type'][i], -edge[i]),
+    )
+
+    entries = []
+    group_key = None
+    open_entries = []
+    for i in order:
+        key = (legs['date'][i], legs['bet_type'][i])
+        if key != group_key:
+            group_key, open_entries = key, []
+            picks = bet_types[key[1]]['picks']
+        player = legs['player_key'][i]
+        for entry in open_entries:
+            if player not in entry[1]:
+                break
+        else:
+            entry = (key[1], set(), [])
+            open_entries.append(entry)
+        entry[1].add(player)
+        entry[2].append(i)
+        if len(entry[2]) == picks:
+            open_entries.remove(entry)
+            entries.append((entry[0], entry[2]))
+    return entries
+
+
+def settle_entries(entries, outcomes, bet_types=None):
+    """
+    Pay every entry (1 unit staked) from its payout table.
+
+    Voided picks drop the entry to the same type with fewer picks, as
+    PrizePicks does; with no such table (or fewer than 2 picks left) the
+    stake is refunded. Returns a list of (bet_type, hits, live picks, multiplier).
+    """
+    bet_types = BET_TYPES if bet_types is None else bet_types
+    by_shape = {(info.get('type'), info.get('picks')): info for info in bet_types.values()}
+
+    settled = []
+    for bet_type, indexes in entries:
+        leg_outcomes = [outcomes[i] for i in indexes]
+        live = len(leg_outcomes) - leg_outcomes.count(VOID)
+        hits = leg_outcomes.count(HIT)
+        info = bet_types[bet_type]
+        if live < len(leg_outcomes):
+            info = by_shape.get((info.get('type'), live)) if live >= 2 else None
+        multiplier = 1.0 if info is None else info['payouts'].get(hits, 0)
+        settled.append((bet_type, hits, live, multiplier))
+    return settled
+
+
+def calibration(legs, outcomes, buckets=EDGE_BUCKETS):
+    """Predicted vs actual win rate (and Brier score) of settled legs by edge bucket."""
+    n = [0] * len(buckets)
+    predicted = [0.0] * len(buckets)
+    won = [0] * len(buckets)
+    brier = [0.0] * len(buckets)
+    for edge, win_pct, outcome in zip(legs['edge'], legs['win_pct'], outcomes):
+        if outcome == VOID:
+            continue
+        b = max(bisect_right(buckets, edge) - 1, 0)
+        p = win_pct / 100
+        n[b] += 1
+        predicted[b] += p
+        won[b] += outcome
+        brier[b] += (p - outcome) ** 2
+
+    rows = []
+    for b, low in enumerate(buckets):
+        if not n[b]:
+            continue
+        high = buckets[b + 1] if b + 1 < len(buckets) else None
+        rows.append({
+            'bucket': f"{low}-{high}%" if high is not None else f"{low}%+",
+            'legs': n[b],
+            'predicted_win_pct': round(predicted[b] / n[b] * 100, 2),
+            'actual_win_pct': round(won[b] / n[b] * 100, 2),
+            'brier': round(brier[b] / n[b], 4),
+        })
+    return rows
+
+
+def run_backtest(results_path, paths=None, bet_types=None):
+    """Replay snapshots against results and return the report dict."""
+    bet_types = BET_TYPES if bet_types is None else bet_types
+    paths = snapshot_paths() if paths is None else paths
+    results = load_results(results_path)
+    legs = load_legs(paths)
+    outcomes = grade_legs(legs, results)
+    settled = settle_entries(build_entries(legs, bet_types), outcomes, bet_types)
+
+    by_type = {}
+    for bet_type, _, _, multiplier in settled:
+        row = by_type.setdefault(bet_type, {'entries': 0, 'staked': 0, 'returned': 0.0, 'won': 0})
+        row['entries'] += 1
+        row['staked'] += 1
+        row['returned'] += multiplier
+        row['won'] += multiplier > 1
+    for row in by_type.values():
+        row['roi_pct'] = round((row['returned'] - row['staked']) / row['staked'] * 100, 2)
+        row['returned'] = round(row['returned'], 2)
+
+    staked = sum(row['staked'] for row in by_type.values())
+    returned = sum(row['returned'] for row in by_type.values())
+    hits = outcomes.count(HIT)
+    misses = outcomes.count(MISS)
+    return {
+        'snapshots': len(paths),
+        'legs': len(outcomes),
+        'legs_settled': hits + misses,
+        'legs_void': outcomes.count(VOID),
+        'leg_hit_rate': round(hits / (hits + misses) * 100, 2) if hits + misses else 0,
+        'entries': len(settled),
+        'staked': staked,
+        'returned': round(returned, 2),
+        'roi_pct': round((returned - staked) / staked * 100, 2) if staked else 0,
+        'by_bet_type': by_type,
+        'calibration': calibration(legs, outcomes),
+    }
+
+
+def print_report(report):
+    print("\n" + "="*80)
+    print("📈 PROPSHOP BACKTEST")
+    print("="*80)
+    print(f"Snapshots: {report['snapshots']}   Picks: {report['legs']} "
+          f"({report['legs_settled']} settled, {report['legs_void']} void)")
+    print(f"Pick hit rate: {report['leg_hit_rate']}%")
+    print(f"Entries: {report['entries']}   Staked: {report['staked']}u   "
+          f"Returned: {report['returned']}u   ROI: {report['roi_pct']:+.2f}%")
+
+    if report['by_bet_type']:
+        print("\n💰 By bet type:")
+        for bet_type, row in sorted(report['by_bet_type'].items()):
+            print(f"   {bet_type:<14} {row['entries']:>7} entries   won {row['won']:>7}   ROI {row['roi_pct']:+.2f}%")
+
+    if report['calibration']:
+        print("\n🎯 Calibration by edge:")
+        print(f"   {'edge':<8} {'picks':>9} {'predicted':>10} {'actual':>8} {'brier':>7}")
+        for row in report['calibration']:
+            print(f"   {row['bucket']:<8} {row['legs']:>9} {row['predicted_win_pct']:>9.2f}% "
+                  f"{row['actual_win_pct']:>7.2f}% {row['brier']:>7.4f}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest PropShop +EV picks against settled results")
+    parser.add_argument("--results", required=True, help="CSV or JSONL of date,player,stat,value")
+    parser.add_argument("--snapshots", default=str(SNAPSHOT_DIR), help="directory of archived daily snapshots")
+    parser.add_argument("--since", help="first slate date to include (YYYY-MM-DD)")
+    parser.add_argument("--until", help="last slate date to include (YYYY-MM-DD)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    paths = snapshot_paths(args.snapshots, args.since, args.until)
+    if not paths:
+        print(f"❌ No snapshots found in {args.snapshots}")
+        sys.exit(1)
+
+    report = run_backtest(args.results, paths)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
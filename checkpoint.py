@@ -0,0 +1,65 @@
+# checkpoint.py
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+CHECKPOINT_DIR = Path(__file__).parent / "data" / "checkpoints"
+
+
+class ScrapeCheckpoint:
+    """
+    Append-only log of per-player FanDuel results for one slate.
+
+    Each completed player is written as one JSON line and fsynced, so a crash
+    loses at most the player that was in flight. A torn final line (killed
+    mid-write) is ignored when loading.
+    """
+
+    def __init__(self, slate, directory=CHECKPOINT_DIR):
+        self.slate = slate
+        self.path = Path(directory) / f"{slate}.jsonl"
+
+    def load(self):
+        """Return {player_name: record} for every player already captured."""
+        records = {}
+        if not self.path.exists():
+            return records
+
+        with open(self.path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partial write from an interrupted run
+                records[record['player']] = record
+        return records
+
+    def record(self, player_name, props, elapsed_seconds):
+        """Append one player's result and flush it to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps({
+            'player': player_name,
+            'props': props,
+            'elapsed_seconds': round(elapsed_seconds, 3),
+            'captured_at': datetime.utcnow().isoformat() + 'Z',
+        })
+        with open(self.path, 'ab') as f:
+            # Terminate a torn line left by a killed run so it can't swallow this record
+            if f.tell() > 0:
+                with open(self.path, 'rb') as existing:
+                    existing.seek(-1, os.SEEK_END)
+                    if existing.read(1) != b"\n":
+                        line = "\n" + line
+            f.write((line + "\n").encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self):
+        """Start the slate over."""
+        if self.path.exists():
+            self.path.unlink()
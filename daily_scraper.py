@@ -5,107 +5,89 @@ Fetches props from PrizePicks and FanDuel, analyzes for +EV opportunities,
 and saves results to JSON file for dashboard consumption.
 
 Can also be run manually: python daily_scraper.py
+Resume an interrupted run for today's slate: python daily_scraper.py --resume
+
+Sharded across worker processes (each with its own browser session):
+    python daily_scraper.py --enqueue --coordinate --workers 4
+or start the pieces separately:
+    python daily_scraper.py --enqueue
+    python daily_scraper.py --worker        (as many as you like)
+    python daily_scraper.py --coordinate
 """
 
+import argparse
 import asyncio
-import json
+import subprocess
 import sys
+import time
 from datetime import datetime
-from pathlib import Path
-from prizepicks_scraper import fetch_props as fetch_prizepicks_props
-from fanduel_scraper import fetch_odds as fetch_fanduel_odds
-
-# Import analysis functions from main.py
-from main import (
-    BET_TYPES,
-    american_to_probability,
-    calculate_no_vig_probability,
-    find_plus_ev_opportunities
-)
+from checkpoint import ScrapeCheckpoint
+from dedup import dedupe_props, print_dedup_report, record_analysis_time
+from fanduel_scraper import RUN_TIME_BUDGET
+from job_queue import QUEUE_FILE, SHARD_BY, JobQueue, default_worker_id, run_worker, shard_props
+from snapshot import DATA_FILE, publish_snapshot
+from sources import build_sources, gather_props, print_source_report
 
-DATA_FILE = Path(__file__).parent / "data" / "opportunities.json"
+# Analysis core only; importing main would drag in the web stack
+from analysis import find_plus_ev_opportunities, format_opportunities_for_dashboard
 
-def format_opportunities_for_dashboard(opportunities_dict, fanduel_odds):
+def analyze_and_publish(prizepicks_props, fanduel_odds):
     """
-    Convert opportunities dict to dashboard-friendly JSON format.
+    Steps 3-4 of a run: dedupe and analyze the sportsbook props, publish the
+    dashboard snapshot and print the summary. Returns the published data.
     """
-    formatted_opps = []
-    opp_id = 1
+    # Step 3: Analyze each unique prop for +EV opportunities
+    print("\n💰 Analyzing for +EV opportunities...")
+    dedup_report = {}
+    fanduel_odds = dedupe_props(fanduel_odds, prizepicks_props, dedup_report)
+    analysis_started = time.perf_counter()
+    opportunities = find_plus_ev_opportunities(fanduel_odds)
+    record_analysis_time(dedup_report, time.perf_counter() - analysis_started)
     
-    for player, props in opportunities_dict.items():
-        for prop in props:
-            # Determine best direction (Over or Under)
-            best_over = max(prop['over_qualifies'], key=lambda x: x['edge']) if prop['over_qualifies'] else None
-            best_under = max(prop['under_qualifies'], key=lambda x: x['edge']) if prop['under_qualifies'] else None
-            
-            if best_over and (not best_under or best_over['edge'] >= best_under['edge']):
-                direction = 'over'
-                best_bet = best_over
-                all_qualifies = prop['over_qualifies']
-                win_pct = prop['no_vig_over']
-            else:
-                direction = 'under'
-                best_bet = best_under
-                all_qualifies = prop['under_qualifies']
-                win_pct = prop['no_vig_under']
-            
-            # Determine sport from stat type (simple heuristic)
-            stat_lower = prop['stat'].lower()
-            if any(term in stat_lower for term in ['passing', 'rushing', 'receiving', 'touchdown']):
-                sport = 'NFL'
-            elif any(term in stat_lower for term in ['points', 'rebounds', 'assists', '3-pointers', 'blocks', 'steals']):
-                sport = 'NBA'
-            elif any(term in stat_lower for term in ['goals', 'saves', 'shots']):
-                sport = 'NHL'
-            elif any(term in stat_lower for term in ['strikeouts', 'hits', 'runs', 'home runs']):
-                sport = 'MLB'
-            else:
-                sport = 'Other'
-            
-            formatted_opps.append({
-                'id': opp_id,
-                'player': player,
-                'sport': sport,
-                'stat': prop['stat'],
-                'line': prop['line'],
-                'direction': direction,
-                'odds': prop['over_odds'] if direction == 'over' else prop['under_odds'],
-                'no_vig_win_pct': round(win_pct, 2),
-                'edge': round(best_bet['edge'], 2),
-                'best_bet_type': best_bet['bet_type'],
-                'payout': best_bet['payout'],
-                'all_qualifying_bets': [
-                    {
-                        'type': q['bet_type'],
-                        'edge': round(q['edge'], 2),
-                        'payout': q['payout']
-                    } for q in sorted(all_qualifies, key=lambda x: x['edge'], reverse=True)
-                ]
-            })
-            opp_id += 1
+    if not opportunities:
+        print("⚠️  No +EV opportunities found")
+        # Still save empty results
+        data = {
+            'opportunities': [],
+            'stats': {
+                'total_scanned': sum(len(props) for props in fanduel_odds.values()),
+                'plus_ev_found': 0,
+                'conversion_rate': 0,
+                'avg_edge': 0,
+                'best_edge': 0
+            },
+            'last_updated': datetime.utcnow().isoformat() + 'Z',
+            'date': datetime.now().strftime('%Y-%m-%d')
+        }
+    else:
+        total_opps = sum(len(props) for props in opportunities.values())
+        print(f"✅ Found {total_opps} +EV opportunities across {len(opportunities)} players")
+        
+        # Format for dashboard
+        data = format_opportunities_for_dashboard(opportunities, fanduel_odds)
+    data['stats']['dedup'] = dedup_report
     
-    # Calculate stats
-    total_props_scanned = sum(len(props) for props in fanduel_odds.values())
-    total_plus_ev = len(formatted_opps)
-    avg_edge = sum(opp['edge'] for opp in formatted_opps) / total_plus_ev if total_plus_ev > 0 else 0
-    best_edge = max((opp['edge'] for opp in formatted_opps), default=0)
+    # Step 4: Publish the snapshot (atomic; the dashboard server picks up the new version)
+    print(f"\n💾 Saving to {DATA_FILE}...")
+    version = publish_snapshot(data)
     
-    return {
-        'opportunities': formatted_opps,
-        'stats': {
-            'total_scanned': total_props_scanned,
-            'plus_ev_found': total_plus_ev,
-            'conversion_rate': round((total_plus_ev / total_props_scanned * 100), 2) if total_props_scanned > 0 else 0,
-            'avg_edge': round(avg_edge, 2),
-            'best_edge': round(best_edge, 2)
-        },
-        'last_updated': datetime.utcnow().isoformat() + 'Z',
-        'date': datetime.now().strftime('%Y-%m-%d')
-    }
+    print(f"✅ Data saved successfully! (version {version})")
+    print(f"\n📊 Summary:")
+    print(f"   - Total props scanned: {data['stats']['total_scanned']}")
+    print(f"   - +EV opportunities: {data['stats']['plus_ev_found']}")
+    print(f"   - Conversion rate: {data['stats']['conversion_rate']}%")
+    print(f"   - Average edge: {data['stats']['avg_edge']}%")
+    print(f"   - Best edge: {data['stats']['best_edge']}%")
+    print_dedup_report(dedup_report)
+    return data
 
-async def run_daily_scrape():
+async def run_daily_scrape(resume=False):
     """
     Run the full scraping pipeline and save to JSON.
+    
+    FanDuel results are checkpointed per player as they complete. With
+    `resume=True`, players already checkpointed for today's slate are loaded
+    from disk instead of being scraped again.
     """
     print("\n" + "="*80)
     print("🌙 PROPSHOP DAILY SCRAPER")
@@ -113,9 +95,28 @@ async def run_daily_scrape():
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %I:%M:%S %p PST')}\n")
     
     try:
-        # Step 1: Fetch PrizePicks props
-        print("📊 Fetching props from PrizePicks...")
-        prizepicks_props = await fetch_prizepicks_props()
+        # Steps 1-2: Fetch PrizePicks props and FanDuel odds. FanDuel starts on
+        # each player as soon as PrizePicks has parsed its props.
+        print("📊 Fetching props from PrizePicks and odds from FanDuel...")
+        checkpoint = ScrapeCheckpoint(datetime.now().strftime('%Y-%m-%d'))
+        captured = {}
+        if resume:
+            captured = checkpoint.load()
+        else:
+            checkpoint.clear()
+        
+        fanduel_report = {}
+        fetch_report = {}
+        prizepicks_props, fanduel_odds = await gather_props(
+            build_sources('dfs'),
+            build_sources('sportsbook', {'fanduel': {
+                'report': fanduel_report,
+                'skip_players': captured.keys(),
+                'on_player_done': checkpoint.record,
+            }}),
+            fetch_report,
+        )
+        print_source_report(fetch_report)
         
         if not prizepicks_props:
             print("❌ Failed to fetch PrizePicks data (CAPTCHA or network error)")
@@ -124,56 +125,36 @@ async def run_daily_scrape():
             return False
         
         print(f"✅ Fetched props for {len(prizepicks_props)} players from PrizePicks")
+        resumed = {player: record for player, record in captured.items() if player in prizepicks_props}
+        if resume:
+            print(f"♻️  Resumed: {len(resumed)} players already captured in {checkpoint.path.name}")
         
-        # Step 2: Fetch FanDuel odds
-        print("\n🎯 Fetching odds from FanDuel...")
-        fanduel_odds = await fetch_fanduel_odds(prizepicks_props)
+        # Merge checkpointed players back in
+        for player, record in resumed.items():
+            if record['props']:
+                fanduel_odds[player] = record['props']
+        time_saved = sum(record['elapsed_seconds'] for record in resumed.values())
         
         if not fanduel_odds:
             print("❌ Failed to fetch FanDuel odds")
             return False
         
         print(f"✅ Fetched odds for {len(fanduel_odds)} players from FanDuel")
+        if fanduel_report.get('stopped_early'):
+            print(f"⚠️  FanDuel run stopped early ({fanduel_report['stopped_early']}), saving partial results")
         
-        # Step 3: Analyze for +EV opportunities
-        print("\n💰 Analyzing for +EV opportunities...")
-        opportunities = find_plus_ev_opportunities(fanduel_odds)
-        
-        if not opportunities:
-            print("⚠️  No +EV opportunities found")
-            # Still save empty results
-            data = {
-                'opportunities': [],
-                'stats': {
-                    'total_scanned': sum(len(props) for props in fanduel_odds.values()),
-                    'plus_ev_found': 0,
-                    'conversion_rate': 0,
-                    'avg_edge': 0,
-                    'best_edge': 0
-                },
-                'last_updated': datetime.utcnow().isoformat() + 'Z',
-                'date': datetime.now().strftime('%Y-%m-%d')
-            }
-        else:
-            total_opps = sum(len(props) for props in opportunities.values())
-            print(f"✅ Found {total_opps} +EV opportunities across {len(opportunities)} players")
-            
-            # Format for dashboard
-            data = format_opportunities_for_dashboard(opportunities, fanduel_odds)
-        
-        # Step 4: Save to JSON file
-        print(f"\n💾 Saving to {DATA_FILE}...")
-        DATA_FILE.parent.mkdir(exist_ok=True)
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        print("✅ Data saved successfully!")
-        print(f"\n📊 Summary:")
-        print(f"   - Total props scanned: {data['stats']['total_scanned']}")
-        print(f"   - +EV opportunities: {data['stats']['plus_ev_found']}")
-        print(f"   - Conversion rate: {data['stats']['conversion_rate']}%")
-        print(f"   - Average edge: {data['stats']['avg_edge']}%")
-        print(f"   - Best edge: {data['stats']['best_edge']}%")
+        # Steps 3-4: Analyze, publish and summarize
+        analyze_and_publish(prizepicks_props, fanduel_odds)
+        print(f"   - FanDuel players scraped: {fanduel_report['players_scraped']}/{fanduel_report['players_total']}"
+              f" ({len(fanduel_report['players_failed'])} failed, {fanduel_report['players_skipped']} not attempted)")
+        resolution = fanduel_report.get('resolution', {})
+        if resolution:
+            resolved = sum(resolution.values()) - resolution.get('unresolved', 0)
+            print(f"   - Name resolution: {resolved}/{sum(resolution.values())} players pre-resolved, "
+                  f"{len(fanduel_report['players_unmatched'])} unmatched ({fanduel_report['unmatched_seconds']:.0f}s spent), "
+                  f"{fanduel_report['players_skipped_unmatched']} skipped as known mismatches")
+        if resume:
+            print(f"   - Resumed from checkpoint: {len(resumed)} players (~{time_saved / 60:.1f} min of scraping saved)")
         
         print("\n" + "="*80)
         print("🎉 Daily scrape completed successfully!")
@@ -187,9 +168,173 @@ async def run_daily_scrape():
         traceback.print_exc()
         return False
 
+# How often the coordinator checks the queue, how long finished workers get to
+# exit, and how long a terminated worker gets to close its browser before it is killed
+COORDINATOR_POLL_SECONDS = 10
+WORKER_EXIT_SECONDS = 60
+WORKER_TERMINATE_SECONDS = 10
+
+async def enqueue_slate(queue, slate, shard_by='player', deadline_minutes=RUN_TIME_BUDGET / 60):
+    """Fetch the PrizePicks slate and queue one scrape job per shard."""
+    print("📊 Fetching props from PrizePicks...")
+    fetch_report = {}
+    prizepicks_props, _ = await gather_props(build_sources('dfs'), [], fetch_report)
+    print_source_report(fetch_report)
+    if not prizepicks_props:
+        print("❌ Failed to fetch PrizePicks data (CAPTCHA or network error)")
+        return False
+    
+    shards = shard_props(prizepicks_props, shard_by)
+    queue.enqueue(slate, shards, time.time() + deadline_minutes * 60)
+    print(f"📬 Queued {len(shards)} jobs ({len(prizepicks_props)} players, one per {shard_by}) in {queue.path} "
+          f"for slate {slate}, deadline in {deadline_minutes:.0f} min")
+    return True
+
+async def run_scrape_worker(queue, slate, worker_id=None):
+    """Scrape queued jobs with FanDuel until the slate is drained or its deadline passes."""
+    worker_id = worker_id or default_worker_id()
+    deadline = queue.deadline(slate)
+    if deadline is None:
+        print(f"❌ Nothing queued for slate {slate} in {queue.path}")
+        return False
+    
+    fanduel_report = {}
+    source, = build_sources('sportsbook', {'fanduel': {
+        'report': fanduel_report,
+        'time_budget': max(0, min(RUN_TIME_BUDGET, deadline - time.time())),
+    }}, names=['fanduel'])
+    print(f"👷 Worker {worker_id} pricing slate {slate}")
+    try:
+        stats = await run_worker(queue, slate, source, worker_id, fanduel_report)
+    except Exception as e:
+        print(f"\n❌ Worker {worker_id} failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+    print(f"\n👷 Worker {worker_id}: {stats['jobs_done']} jobs done ({stats['players']} players priced, "
+          f"{stats['players_failed']} failed), {stats['jobs_released']} released, "
+          f"{stats['jobs_lost']} lost to expired leases")
+    if fanduel_report.get('stopped_early'):
+        print(f"⚠️  Stopped early ({fanduel_report['stopped_early']})")
+    return True
+
+def spawn_workers(count, queue_path, slate):
+    """Start `count` local `--worker` processes on the same queue."""
+    return [
+        subprocess.Popen([
+            sys.executable, __file__, '--worker', '--queue', str(queue_path), '--slate', slate,
+            '--worker-id', f"{default_worker_id()}-w{n}",
+        ])
+        for n in range(1, count + 1)
+    ]
+
+async def run_coordinator(queue, slate, workers=0):
+    """
+    Wait for the slate's jobs to finish (or its deadline), merge the workers'
+    results and run the analysis once. With `workers`, starts that many local
+    worker processes first.
+    """
+    deadline = queue.deadline(slate)
+    if deadline is None:
+        print(f"❌ Nothing queued for slate {slate} in {queue.path}")
+        return False
+    
+    processes = spawn_workers(workers, queue.path, slate) if workers else []
+    if processes:
+        print(f"👷 Started {len(processes)} local workers")
+    started = time.monotonic()
+    last_counts = None
+    try:
+        while not queue.is_finished(slate) and time.time() < deadline:
+            counts = queue.counts(slate)
+            if counts != last_counts:
+                print(f"⏳ Jobs: {counts['done']} done, {counts['leased']} running, "
+                      f"{counts['queued']} queued, {counts['failed']} failed")
+                last_counts = counts
+            if processes and all(process.poll() is not None for process in processes):
+                print("⚠️  All local workers exited before the queue drained")
+                break
+            await asyncio.sleep(min(COORDINATOR_POLL_SECONDS, max(0, deadline - time.time())))
+    finally:
+        # Workers exit by themselves once the queue is drained (after closing
+        # their browser); past the deadline, don't hold the publish for them:
+        # terminate them, and kill any that ignore it
+        grace = WORKER_EXIT_SECONDS if queue.is_finished(slate) else 0
+        for process in processes:
+            try:
+                process.wait(timeout=grace)
+            except subprocess.TimeoutExpired:
+                process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=WORKER_TERMINATE_SECONDS)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+    
+    prizepicks_props, fanduel_odds, report = queue.results(slate)
+    print(f"\n🧩 Merged {len(report['workers'])} workers' results in {time.monotonic() - started:.0f}s: "
+          f"{report['jobs']['done']}/{sum(report['jobs'].values())} jobs done")
+    if report['failed_shards']:
+        print(f"⚠️  {len(report['failed_shards'])} jobs failed: {report['failed_shards']}")
+    if report['unfinished_shards']:
+        print(f"⚠️  {len(report['unfinished_shards'])} jobs unfinished at the deadline")
+    if report['failed_players']:
+        print(f"⚠️  {len(report['failed_players'])} players failed to scrape: {', '.join(report['failed_players'])}")
+    if not fanduel_odds:
+        print("❌ No FanDuel odds came back from the workers")
+        return False
+    
+    analyze_and_publish(prizepicks_props, fanduel_odds)
+    for worker_id, worker in sorted(report['workers'].items()):
+        print(f"   - Worker {worker_id}: {worker['jobs']} jobs in {worker['seconds']:.0f}s")
+    return True
+
+async def run_queue_modes(args):
+    slate = args.slate or datetime.now().strftime('%Y-%m-%d')
+    queue = JobQueue(args.queue)
+    try:
+        if args.enqueue and not await enqueue_slate(queue, slate, args.shard_by, args.deadline):
+            return False
+        if args.worker:
+            return await run_scrape_worker(queue, slate, args.worker_id)
+        if args.coordinate:
+            return await run_coordinator(queue, slate, args.workers)
+        return True
+    finally:
+        queue.close()
+
 def main():
     """Main entry point."""
-    success = asyncio.run(run_daily_scrape())
+    parser = argparse.ArgumentParser(description="PropShop daily scraper")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip players already captured for today's slate by an interrupted run",
+    )
+    sharding = parser.add_argument_group("sharded runs (job queue shared by worker processes)")
+    sharding.add_argument("--enqueue", action="store_true", help="fetch PrizePicks and queue one FanDuel job per shard")
+    sharding.add_argument("--worker", action="store_true", help="claim queued jobs and scrape them until the queue is drained")
+    sharding.add_argument("--coordinate", action="store_true",
+                          help="wait for the jobs (or the deadline), then merge results and run the analysis")
+    sharding.add_argument("--workers", type=int, default=0, metavar="N",
+                          help="with --coordinate, start N local worker processes")
+    sharding.add_argument("--shard-by", choices=SHARD_BY, default='player', help="job granularity (default: player)")
+    sharding.add_argument("--deadline", type=float, default=RUN_TIME_BUDGET / 60, metavar="MINUTES",
+                          help="with --enqueue, minutes until the coordinator publishes whatever is done")
+    sharding.add_argument("--queue", default=QUEUE_FILE, help=f"queue database (default: {QUEUE_FILE})")
+    sharding.add_argument("--slate", help="slate date (default: today)")
+    sharding.add_argument("--worker-id", help="name recorded on this worker's leases (default: host-pid)")
+    args = parser.parse_args()
+    
+    if args.enqueue or args.worker or args.coordinate:
+        if args.resume:
+            parser.error("--resume applies to single-process runs only")
+        if args.worker and (args.enqueue or args.coordinate):
+            parser.error("run --worker in its own process (or use --coordinate --workers N)")
+        success = asyncio.run(run_queue_modes(args))
+    else:
+        success = asyncio.run(run_daily_scrape(resume=args.resume))
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
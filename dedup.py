@@ -0,0 +1,191 @@
+# dedup.py
+
+import functools
+import time
+
+from analysis import american_to_probability, parse_american_odds
+from name_index import normalize_name
+
+# Abbreviated words, expanded wherever they appear in a stat name, so "Pass
+# Yds", "Passing Yards" and "Pass Yards" are one stat.
+STAT_WORDS = {
+    'yds': 'yards', 'yd': 'yards',
+    'pass': 'passing', 'rush': 'rushing', 'rec': 'receiving',
+    'td': 'touchdowns', 'tds': 'touchdowns',
+    'att': 'attempts', 'atts': 'attempts',
+}
+
+# Sportsbook/DFS spellings of the same stat, after STAT_WORDS. Combo stats
+# are split on "+" and each part is looked up, so "Pts+Rebs+Asts" and
+# "Points + Rebounds + Assists" canonicalize the same way.
+STAT_ALIASES = {
+    'pts': 'points', 'point': 'points',
+    'reb': 'rebounds', 'rebs': 'rebounds', 'rebound': 'rebounds', 'total rebounds': 'rebounds',
+    'ast': 'assists', 'asts': 'assists', 'assist': 'assists',
+    'blk': 'blocks', 'blks': 'blocks', 'block': 'blocks', 'blocked shots': 'blocks',
+    'stl': 'steals', 'stls': 'steals', 'steal': 'steals',
+    '3-pt made': 'threes', '3pt made': 'threes', '3-pointers made': 'threes', '3-pointers': 'threes',
+    'three pointers made': 'threes', 'made threes': 'threes', '3pm': 'threes',
+    'sog': 'shots on goal',
+    'pitcher strikeouts': 'strikeouts', 'ks': 'strikeouts',
+}
+
+# Implied over + under probability (%) a genuine pair from one book can have.
+# Below 100 there's no vig at all and above this the sides almost certainly
+# come from different lines or markets.
+MIN_PAIR_OVERROUND = 100.0
+MAX_PAIR_OVERROUND = 125.0
+
+
+@functools.lru_cache(maxsize=4096)
+def canonical_stat(stat):
+    """Canonical stat name: lowercase, abbreviations expanded, aliases resolved, combo parts sorted."""
+    parts = []
+    for part in stat.replace('\u2212', '-').lower().split('+'):
+        part = ' '.join(STAT_WORDS.get(word, word) for word in part.split())
+        if part:
+            parts.append(STAT_ALIASES.get(part, part))
+    return '+'.join(sorted(parts))
+
+
+def canonical_line(line):
+    return round(float(line), 2)
+
+
+@functools.lru_cache(maxsize=65536)
+def market_key(stat, line):
+    """(canonical stat, line) -- how a DFS line and a sportsbook market are matched."""
+    return canonical_stat(stat), canonical_line(line)
+
+
+def player_identity(player_name, dfs_props=None):
+    """DFS player ID when known, else the normalized display name."""
+    for prop in dfs_props or ():
+        if prop.get('player_id') is not None:
+            return 'id:' + str(prop['player_id'])
+    return 'name:' + normalize_name(player_name)
+
+
+def prop_identity(player_key, prop, events=None):
+    """(player, canonical stat, line, event): one per distinct market on a slate."""
+    stat, line = market_key(prop['stat'], prop['line'])
+    event = prop.get('event')
+    if event is None and events:
+        event = events.get((stat, line))
+    return player_key, stat, line, event
+
+
+def pair_problem(over_odds, under_odds):
+    """Why an over/under pair can't be trusted, or None if it looks like one market."""
+    if over_odds is None or under_odds is None:
+        return 'unpaired'
+    total = american_to_probability(over_odds) + american_to_probability(under_odds)
+    if total < MIN_PAIR_OVERROUND:
+        return 'no vig (mismatched sides)'
+    if total > MAX_PAIR_OVERROUND:
+        return 'vig too high (mismatched sides)'
+    return None
+
+
+def dedupe_props(book_props, dfs_props=None, report=None):
+    """
+    Collapse sportsbook captures to one prop per market before analysis.
+
+    Every captured prop is keyed by prop_identity (player ID from the DFS
+    slate, canonical stat, line, event), so the same market captured twice
+    -- a player listed on several cards, two books, a resumed checkpoint --
+    is analyzed once. Odds are parsed to ints and pairs whose sides can't
+    belong to one market are dropped. When a market was captured more than
+    once, the latest 'captured_at' wins (ties: the later capture).
+
+    Returns {player_name: [props]} in input order; `report` is filled with
+    capture/duplicate/rejection counts.
+    """
+    started = time.perf_counter()
+    dfs_props = dfs_props or {}
+    report = {} if report is None else report
+    rejected = {}
+    odds_cache = {None: None}  # scraped odds strings repeat across the slate
+    winners = {}   # identity -> ((captured_at, order), player_name, prop)
+    captured = conflicts = 0
+
+    def parse_odds(value):
+        odds = odds_cache.get(value, odds_cache)
+        if odds is odds_cache:
+            odds = odds_cache[value] = parse_american_odds(value)
+        return odds
+
+    for player_name, props in book_props.items():
+        player_dfs = dfs_props.get(player_name)
+        player_key = player_identity(player_name, player_dfs)
+        events = {
+            market_key(p['stat'], p['line']): p['event']
+            for p in player_dfs or () if p.get('event') is not None
+        }
+        for prop in props:
+            captured += 1
+            try:
+                over_odds = parse_odds(prop.get('over_odds'))
+                under_odds = parse_odds(prop.get('under_odds'))
+                identity = prop_identity(player_key, prop, events)
+            except (ValueError, TypeError, KeyError) as e:
+                reason = f"unparseable ({e.__class__.__name__})"
+                rejected[reason] = rejected.get(reason, 0) + 1
+                continue
+            problem = pair_problem(over_odds, under_odds)
+            if problem:
+                rejected[problem] = rejected.get(problem, 0) + 1
+                continue
+
+            clean = dict(prop, line=identity[2], over_odds=over_odds, under_odds=under_odds)
+            if identity[3] is not None:
+                clean['event'] = identity[3]
+            rank = (prop.get('captured_at') or '', captured)
+            current = winners.get(identity)
+            if current is not None:
+                if (current[2]['over_odds'], current[2]['under_odds']) != (over_odds, under_odds):
+                    conflicts += 1
+                if rank < current[0]:
+                    continue
+            winners[identity] = (rank, player_name, clean)
+
+    # First display name seen for each player keeps the props (dict order = input order)
+    display_names = {}
+    deduped = {}
+    for identity, (_, player_name, prop) in sorted(winners.items(), key=lambda item: item[1][0][1]):
+        name = display_names.setdefault(identity[0], player_name)
+        deduped.setdefault(name, []).append(prop)
+
+    unique = len(winners)
+    report.update({
+        'captured': captured,
+        'unique': unique,
+        'duplicates_removed': captured - unique - sum(rejected.values()),
+        'conflicts': conflicts,
+        'rejected': rejected,
+        'dedup_seconds': round(time.perf_counter() - started, 4),
+    })
+    return deduped
+
+
+def record_analysis_time(report, analysis_seconds):
+    """Add the analysis time and what analyzing the removed duplicates would have cost."""
+    unique = report.get('unique') or 0
+    report['analysis_seconds'] = round(analysis_seconds, 4)
+    report['analysis_seconds_saved'] = round(
+        analysis_seconds / unique * report.get('duplicates_removed', 0), 4
+    ) if unique else 0.0
+    return report
+
+
+def print_dedup_report(report):
+    rejected = sum(report['rejected'].values())
+    line = (f"   - Dedup: {report['captured']} captured -> {report['unique']} unique props "
+            f"({report['duplicates_removed']} duplicates removed, {report['conflicts']} with conflicting odds, "
+            f"{rejected} rejected)")
+    print(line)
+    if report['rejected']:
+        print(f"     Rejected: {report['rejected']}")
+    if 'analysis_seconds_saved' in report:
+        print(f"     Analysis: {report['analysis_seconds'] * 1000:.1f} ms, "
+              f"~{report['analysis_seconds_saved'] * 1000:.1f} ms saved by skipping duplicates")
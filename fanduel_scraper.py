@@ -2,7 +2,20 @@
 
 import asyncio
 import random
-from playwright.async_api import async_playwright
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime
+from dedup import market_key
+from name_index import NameIndex, match_label_name, surname_token
+from page_filter import ResourceFilter
+from resilience import (
+    BudgetExhausted,
+    CaptchaError,
+    CircuitBreaker,
+    CircuitOpen,
+    RunBudget,
+    call_with_retry,
+)
 
 FANDUEL_HOME_URL = "https://sportsbook.fanduel.com/"
 
@@ -10,16 +23,30 @@ FANDUEL_HOME_URL = "https://sportsbook.fanduel.com/"
 MIN_DELAY_BETWEEN_PLAYERS = 8  # seconds
 MAX_DELAY_BETWEEN_PLAYERS = 15  # seconds
 
+# Time budget for a whole FanDuel run and deadlines for individual page calls.
+# Per-call deadlines are capped by whatever is left of the run budget.
+RUN_TIME_BUDGET = 45 * 60  # seconds
+NAVIGATION_TIMEOUT = 30  # seconds
+SEARCH_ICON_TIMEOUT = 20  # seconds
+SEARCH_INPUT_TIMEOUT = 10  # seconds
+MARKETS_TIMEOUT = 15  # seconds
+
+# Stop the run after this many players in a row fail (after retries)
+CONSECUTIVE_FAILURE_LIMIT = 5
+
 async def solve_captcha(page, max_attempts=3):
     """
     Attempts to solve FanDuel CAPTCHA with retry logic.
     Returns True if solved or not present, False if failed after all attempts.
     """
+    captcha_seen = False
     for attempt in range(max_attempts):
+        visible_this_attempt = False
         try:
             captcha_frame_locator = page.frame_locator("iframe[title*='Challenge']")
             hold_button = captcha_frame_locator.locator("button:has-text('Press & Hold')")
             await hold_button.wait_for(state="visible", timeout=5000)
+            captcha_seen = visible_this_attempt = True
             
             print(f"  🔒 FanDuel CAPTCHA detected! Solving attempt {attempt + 1}/{max_attempts}...")
             box = await hold_button.bounding_box()
@@ -48,36 +75,260 @@ async def solve_captcha(page, max_attempts=3):
             return True
             
         except Exception as e:
+            if not visible_this_attempt:
+                # Never shown, or cleared itself since the last attempt
+                print("  ✓ CAPTCHA solved." if captcha_seen else "  ✓ No CAPTCHA shown.")
+                return True
             if attempt < max_attempts - 1:
                 print(f"  ⚠️  CAPTCHA solve attempt {attempt + 1} failed, retrying...")
                 await asyncio.sleep(random.uniform(1.0, 2.0))
-            else:
-                print("  ❌ CAPTCHA not visible or already solved.")
-                return True  # Assume it's not there
     
+    print("  ❌ CAPTCHA still present after all attempts.")
     return False
 
-async def fetch_odds(prizepicks_props_by_player: dict):
+async def scrape_player(page, player_name, prizepicks_props, budget, search_name=None, search_name_confirmed=True):
+    """
+    Searches FanDuel for a single player and returns (props, fanduel_name,
+    label_names): their props that match the given PrizePicks lines, the name
+    FanDuel lists them under (None if no markets matched the player), and the
+    player names seen in the market labels (empty if no markets loaded).
+    
+    `search_name` is the resolved FanDuel name; markets are located by surname
+    and then matched by normalized/fuzzy name, so "C.J. Stroud" still finds
+    "CJ Stroud". The PrizePicks name is tried first; an unconfirmed (fuzzy)
+    `search_name` is only used to search, never to pick a label, so a
+    similarly named teammate can't be taken for our player.
+    Every page call gets a deadline from `budget`.
+    Raises on navigation/CAPTCHA failures so the caller can retry.
+    """
+    search_name = search_name or player_name
+    # For each player, we start fresh by navigating to the homepage.
+    print(f"Navigating to FanDuel homepage for new search...")
+    await page.goto(FANDUEL_HOME_URL, wait_until="domcontentloaded", timeout=budget.timeout_ms(NAVIGATION_TIMEOUT))
+    print("FanDuel homepage has loaded.")
+
+    # --- IMPROVED CAPTCHA HANDLING ---
+    captcha_solved = await solve_captcha(page)
+    if not captcha_solved:
+        raise CaptchaError(f"FanDuel CAPTCHA not solved while searching for {player_name}")
+
+    # Patiently wait for the page to be interactive.
+    print("Waiting for the page to become fully interactive...")
+    search_icon_button = page.get_by_role("link", name="Search").first
+    await search_icon_button.wait_for(state="visible", timeout=budget.timeout_ms(SEARCH_ICON_TIMEOUT))
+    print("Page is interactive. The search icon is now visible and ready.")
+
+    await search_icon_button.click()
+    print("Search icon clicked. Waiting for the search input field...")
+
+    search_input = page.get_by_placeholder("Search")
+    await search_input.wait_for(state="visible", timeout=budget.timeout_ms(SEARCH_INPUT_TIMEOUT))
+    
+    print("Typing the player's name into the search bar...")
+    await search_input.fill(search_name, timeout=budget.timeout_ms(SEARCH_INPUT_TIMEOUT))
+    
+    # Wait for the prop markets to load. A player with no markets on FanDuel
+    # is not a failure, so don't let the timeout trigger retries.
+    print("Waiting for player prop markets to load on the search page...")
+    market_container_selector = f'div[aria-label*="{surname_token(search_name)}"]'
+    try:
+        await page.locator(market_container_selector).first.wait_for(state="visible", timeout=budget.timeout_ms(MARKETS_TIMEOUT))
+    except Exception as e:
+        if type(e).__name__ != "TimeoutError":
+            raise
+        print(f"  ⚠️  No FanDuel markets showed up for {player_name}")
+        return [], None, set()
+    print("Player prop markets have loaded successfully.")
+    
+    # --- PARSING LOGIC WITH DATA STORAGE ---
+    print("Parsing loaded props...")
+    market_groups = await page.locator(market_container_selector).all()
+    aria_labels = [await group.get_attribute("aria-label") for group in market_groups]
+    
+    # The surname selector can also catch teammates/namesakes; keep only the
+    # labels whose player part is our player.
+    label_names = {label.split(" - ")[0].strip() for label in aria_labels if label and " - " in label}
+    wanted_names = [player_name, search_name] if search_name_confirmed else [player_name]
+    fanduel_name = match_label_name(wanted_names, label_names)
+    if fanduel_name is None:
+        print(f"  ⚠️  Markets found for '{surname_token(search_name)}' but none match {player_name} (saw: {', '.join(sorted(label_names)) or 'nothing'})")
+        return [], None, label_names
+    
+    # Store props temporarily to match Over/Under pairs
+    temp_props = {}
+    wanted_markets = {market_key(pp_prop['stat'], pp_prop['line']) for pp_prop in prizepicks_props}
+    captured_at = datetime.utcnow().isoformat() + 'Z'
+    
+    for aria_label in aria_labels:
+        if not aria_label:
+            continue
+        
+        # Parse aria-label format: "Player - Stat, Player Over/Under, Line, Odds"
+        # Example: "Deni Avdija - Points, Deni Avdija Over, 28.5, -136"
+        parts = [p.strip() for p in aria_label.split(",")]
+        
+        if len(parts) < 4:
+            continue  # Not a valid prop format
+        
+        # Extract components
+        stat_part = parts[0]  # "Deni Avdija - Points"
+        direction_part = parts[1]  # "Deni Avdija Over" or "Deni Avdija Under"
+        line_value = parts[2]  # "28.5"
+        odds_value = parts[3]  # "-136"
+        
+        # Extract stat type
+        if " - " not in stat_part:
+            continue
+        label_player, stat_type = [x.strip() for x in stat_part.split(" - ", 1)]
+        if label_player != fanduel_name:
+            continue
+        
+        # Determine direction
+        if "Over" in direction_part:
+            direction = "Over"
+        elif "Under" in direction_part:
+            direction = "Under"
+        else:
+            continue
+        
+        # Keep only stat/lines PrizePicks offers. Stats must match exactly after
+        # canonicalization ("Pts" == "Points", but "Points" != "Points + Rebounds").
+        try:
+            market = market_key(stat_type, line_value)
+        except ValueError:
+            continue
+        if market not in wanted_markets:
+            continue  # Skip props that don't match PrizePicks
+        
+        # Create unique key for this prop
+        prop_key = f"{player_name}|{stat_type}|{line_value}"
+        
+        if prop_key not in temp_props:
+            temp_props[prop_key] = {
+                "player": player_name,
+                "stat": stat_type,  # Changed from stat_type to stat
+                "line": line_value,
+                "over_odds": None,
+                "under_odds": None,
+                "captured_at": captured_at,
+            }
+        
+        # Add the odds
+        if direction == "Over":
+            temp_props[prop_key]["over_odds"] = odds_value
+        else:
+            temp_props[prop_key]["under_odds"] = odds_value
+    
+    # Convert temp props to final list and output
+    player_props = []
+    for prop_key, prop_data in temp_props.items():
+        if prop_data["over_odds"] and prop_data["under_odds"]:
+            player_props.append(prop_data)
+            print(f"  ✅ {prop_data['player']} - {prop_data['stat']} {prop_data['line']}, Over: {prop_data['over_odds']}, Under: {prop_data['under_odds']}")
+    
+    if not player_props:
+        print(f"  ⚠️  No matching FanDuel odds found for PrizePicks lines")
+    
+    return player_props, fanduel_name, label_names
+
+async def fetch_odds(prizepicks_props_by_player: dict, time_budget=RUN_TIME_BUDGET, report=None,
+                     skip_players=None, on_player_done=None, name_index=None):
     """
     Scrapes FanDuel by searching for each player and then parsing the loaded props.
     This version uses the aria-label selector for maximum reliability.
     
+    The run is bounded by `time_budget` seconds. Failed players are retried
+    with backoff depending on the error, and the run stops early if too many
+    players fail in a row; whatever was captured up to that point is returned.
+    
     Args:
         prizepicks_props_by_player: A dict of props from PrizePicks, keyed by player name.
+        time_budget: Wall-clock budget for the whole run, in seconds.
+        report: Optional dict that is filled with run counters (scraped,
+            failed, skipped, stop reason, elapsed seconds).
+        skip_players: Player names already captured (e.g. by a checkpoint) that
+            should not be searched again.
+        on_player_done: Optional callback(player_name, props, elapsed_seconds)
+            called as soon as each player has been scraped successfully.
+        name_index: NameIndex used to translate PrizePicks names to FanDuel
+            names; the persisted index is loaded when not given.
     """
-    print("\n--- Running FanDuel Scraper (Aria-Label Strategy) ---")
+    skip_players = set(skip_players or ())
+    player_names = [name for name in (prizepicks_props_by_player or {}) if name not in skip_players]
     
-    if not prizepicks_props_by_player:
-        print("No PrizePicks props to compare against. Skipping FanDuel scrape.")
+    if not prizepicks_props_by_player or not player_names:
+        print("\n--- Running FanDuel Scraper (Aria-Label Strategy) ---")
+        if report is not None:
+            report.update(_new_report())
+        if not prizepicks_props_by_player:
+            print("No PrizePicks props to compare against. Skipping FanDuel scrape.")
+        else:
+            print(f"All {len(skip_players)} players already captured. Skipping FanDuel scrape.")
         return {}
+    
+    async def players():
+        for name, props in prizepicks_props_by_player.items():
+            yield name, props
+    
+    return await fetch_odds_stream(
+        players(), time_budget=time_budget, report=report, skip_players=skip_players,
+        on_player_done=on_player_done, name_index=name_index,
+        expected_players=len(prizepicks_props_by_player),
+    )
 
-    player_names = list(prizepicks_props_by_player.keys())
-    print(f"Will search FanDuel for {len(player_names)} players.")
+def _new_report():
+    return {
+        'players_total': 0,
+        'players_scraped': 0,
+        'players_failed': [],
+        'players_skipped': 0,
+        'stopped_early': None,
+        'elapsed_seconds': 0.0,
+        'resolution': {},
+        'players_unmatched': [],
+        'unmatched_seconds': 0.0,
+        'players_skipped_unmatched': 0,
+        'players_skipped_captured': 0,
+    }
+
+async def fetch_odds_stream(players, time_budget=RUN_TIME_BUDGET, report=None, skip_players=None,
+                            on_player_done=None, name_index=None, expected_players=None):
+    """
+    Same as fetch_odds, but consumes PrizePicks players as they arrive.
+    
+    `players` is an async iterable of (player_name, prizepicks_props). The
+    browser is launched when the first player that needs searching arrives
+    (a stream with nothing to price never starts one), and each player is
+    searched as soon as it is received. Names are resolved per player
+    instead of for the whole slate. `expected_players` is only used for
+    progress output.
+    """
+    print("\n--- Running FanDuel Scraper (Aria-Label Strategy) ---")
+    
+    skip_players = set(skip_players or ())
+    if report is None:
+        report = {}
+    report.update(_new_report())
+    
+    slate = datetime.now().strftime('%Y-%m-%d')
+    if name_index is None:
+        name_index = NameIndex()
+    
+    print(f"Searching FanDuel as PrizePicks players arrive (time budget {time_budget / 60:.0f} min).")
+    
+    budget = RunBudget(time_budget)
+    breaker = CircuitBreaker(CONSECUTIVE_FAILURE_LIMIT)
     
     # Store all scraped data
     all_fanduel_data = {}
+    browser = resource_filter = page = None
 
-    async with async_playwright() as p:
+    async def open_page(stack):
+        nonlocal browser, resource_filter
+        # Playwright is heavy to import; only load it when we actually scrape
+        from playwright.async_api import async_playwright
+        
+        p = await stack.enter_async_context(async_playwright())
         # Better anti-detection for FanDuel
         browser = await p.chromium.launch(
             headless=False,
@@ -94,6 +345,10 @@ async def fetch_odds(prizepicks_props_by_player: dict):
             locale='en-US',
         )
         
+        # We only read aria-labels; don't download images, fonts, video or trackers
+        resource_filter = ResourceFilter("fanduel")
+        await resource_filter.install(context)
+        
         page = await context.new_page()
         
         # Enhanced stealth
@@ -102,157 +357,112 @@ async def fetch_odds(prizepicks_props_by_player: dict):
             Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
             window.chrome = {runtime: {}};
         """)
+        return page
 
-        # Search for all players
-        total_players = len(player_names)
-        for i, player_name in enumerate(player_names):
-            print(f"\n--- ({i+1}/{total_players}) Searching for player: {player_name} ---")
+    # The browser is only started once a player actually needs searching
+    async with AsyncExitStack() as stack:
+        # Search for each player as it arrives
+        total_players = expected_players or '?'
+        i = 0
+        async for player_name, prizepicks_props in players:
+            if player_name in skip_players:
+                report['players_skipped_captured'] += 1
+                continue
+            if name_index.is_unmatched(slate, player_name):
+                # Came up empty earlier on this slate
+                report['players_skipped_unmatched'] += 1
+                continue
+            
+            player_id = prizepicks_props[0].get('player_id') if prizepicks_props else None
+            search_name, method = name_index.resolve(player_name, player_id)
+            report['resolution'][method] = report['resolution'].get(method, 0) + 1
+            report['players_total'] += 1
+            if page is None:
+                page = await open_page(stack)
+            
+            if i == 1:
+                # Add human-like delay after the first player
+                delay = random.uniform(MIN_DELAY_BETWEEN_PLAYERS, MAX_DELAY_BETWEEN_PLAYERS)
+                print(f"\n⏱️  Waiting {delay:.1f}s before next player (appears more human)...")
+                await asyncio.sleep(min(delay, budget.remaining()))
+            i += 1
+            
+            print(f"\n--- ({i}/{total_players}) Searching for player: {player_name} ---")
+            player_started = time.monotonic()
             try:
-                # For each player, we start fresh by navigating to the homepage.
-                print(f"Navigating to FanDuel homepage for new search...")
-                await page.goto(FANDUEL_HOME_URL, wait_until="domcontentloaded", timeout=90000)
-                print("FanDuel homepage has loaded.")
-
-                # --- IMPROVED CAPTCHA HANDLING ---
-                captcha_solved = await solve_captcha(page)
-                if not captcha_solved:
-                    print("⚠️  Failed to solve CAPTCHA, skipping this player...")
-                    continue
-
-                # Patiently wait for the page to be interactive.
-                print("Waiting for the page to become fully interactive...")
-                search_icon_button = page.get_by_role("link", name="Search").first
-                await search_icon_button.wait_for(state="visible", timeout=60000)
-                print("Page is interactive. The search icon is now visible and ready.")
-
-                await search_icon_button.click()
-                print("Search icon clicked. Waiting for the search input field...")
-
-                search_input = page.get_by_placeholder("Search")
-                await search_input.wait_for(state="visible", timeout=15000)
-                
-                print("Typing the player's name into the search bar...")
-                await search_input.fill(player_name, timeout=10000)
-                
-                # Wait for the prop markets to load
-                print("Waiting for player prop markets to load on the search page...")
-                market_container_selector = f'div[aria-label*="{player_name}"]'
-                await page.locator(market_container_selector).first.wait_for(state="visible", timeout=15000)
-                print("Player prop markets have loaded successfully.")
-                
-                # --- PARSING LOGIC WITH DATA STORAGE ---
-                print("Parsing loaded props...")
-                market_groups = await page.locator(f'div[aria-label*="{player_name}"]').all()
-                
-                # Get PrizePicks props for this player to match against
-                prizepicks_props = prizepicks_props_by_player.get(player_name, [])
-                
-                # Store props temporarily to match Over/Under pairs
-                temp_props = {}
-                
-                for group in market_groups:
-                    aria_label = await group.get_attribute("aria-label")
-                    if not aria_label:
-                        continue
-                    
-                    # Parse aria-label format: "Player - Stat, Player Over/Under, Line, Odds"
-                    # Example: "Deni Avdija - Points, Deni Avdija Over, 28.5, -136"
-                    parts = [p.strip() for p in aria_label.split(",")]
-                    
-                    if len(parts) < 4:
-                        continue  # Not a valid prop format
-                    
-                    # Extract components
-                    stat_part = parts[0]  # "Deni Avdija - Points"
-                    direction_part = parts[1]  # "Deni Avdija Over" or "Deni Avdija Under"
-                    line_value = parts[2]  # "28.5"
-                    odds_value = parts[3]  # "-136"
-                    
-                    # Extract stat type
-                    if " - " not in stat_part:
-                        continue
-                    stat_type = stat_part.split(" - ")[1].strip()
-                    
-                    # Determine direction
-                    if "Over" in direction_part:
-                        direction = "Over"
-                    elif "Under" in direction_part:
-                        direction = "Under"
-                    else:
-                        continue
-                    
-                    # Check if this stat/line matches any PrizePicks prop for this player
-                    matches_prizepicks = False
-                    for pp_prop in prizepicks_props:
-                        # Normalize stat names for comparison
-                        pp_stat = pp_prop['stat'].lower()
-                        fd_stat = stat_type.lower()
-                        pp_line = str(pp_prop['line'])
-                        
-                        # Match stat type (handle variations like "Points" vs "Pts")
-                        stat_match = (
-                            pp_stat == fd_stat or
-                            pp_stat in fd_stat or
-                            fd_stat in pp_stat or
-                            (pp_stat == "points" and "point" in fd_stat) or
-                            (pp_stat == "rebounds" and "rebound" in fd_stat) or
-                            (pp_stat == "assists" and "assist" in fd_stat)
-                        )
-                        
-                        if stat_match and pp_line == line_value:
-                            matches_prizepicks = True
-                            break
-                    
-                    if not matches_prizepicks:
-                        continue  # Skip props that don't match PrizePicks
-                    
-                    # Create unique key for this prop
-                    prop_key = f"{player_name}|{stat_type}|{line_value}"
-                    
-                    if prop_key not in temp_props:
-                        temp_props[prop_key] = {
-                            "player": player_name,
-                            "stat": stat_type,  # Changed from stat_type to stat
-                            "line": line_value,
-                            "over_odds": None,
-                            "under_odds": None
-                        }
-                    
-                    # Add the odds
-                    if direction == "Over":
-                        temp_props[prop_key]["over_odds"] = odds_value
-                    else:
-                        temp_props[prop_key]["under_odds"] = odds_value
-                
-                # Convert temp props to final list and output
-                player_props = []
-                for prop_key, prop_data in temp_props.items():
-                    if prop_data["over_odds"] and prop_data["under_odds"]:
-                        player_props.append(prop_data)
-                        print(f"  ✅ {prop_data['player']} - {prop_data['stat']} {prop_data['line']}, Over: {prop_data['over_odds']}, Under: {prop_data['under_odds']}")
-                
-                if not player_props:
-                    print(f"  ⚠️  No matching FanDuel odds found for PrizePicks lines")
-                
-                
-                if player_props:
-                    all_fanduel_data[player_name] = player_props
-                    print(f"  ✅ Captured {len(player_props)} props for {player_name}")
-                else:
-                    print(f"  ⚠️  No relevant props found for {player_name}")
-
+                player_props, fanduel_name, label_names = await call_with_retry(
+                    lambda: scrape_player(page, player_name, prizepicks_props, budget, search_name,
+                                          search_name_confirmed=method != 'fuzzy'),
+                    budget,
+                    breaker,
+                    label=player_name,
+                )
+            except BudgetExhausted:
+                report['stopped_early'] = 'time budget exhausted'
+                break
+            except CircuitOpen:
+                report['stopped_early'] = f'{breaker.consecutive_failures} consecutive failures'
+                break
             except Exception as e:
                 print(f"A critical error occurred while searching for {player_name}: {e}")
+                report['players_failed'].append(player_name)
+                if breaker.is_open:
+                    report['stopped_early'] = f'{breaker.consecutive_failures} consecutive failures'
+                    break
                 continue
             
-            # Add human-like delay between players
-            if i < 1:  # Don't delay after last player
-                delay = random.uniform(MIN_DELAY_BETWEEN_PLAYERS, MAX_DELAY_BETWEEN_PLAYERS)
-                print(f"\n⏱️  Waiting {delay:.1f}s before next player (appears more human)...")
-                await asyncio.sleep(delay)
+            report['players_scraped'] += 1
+            if fanduel_name is not None:
+                name_index.learn(fanduel_name, player_name, player_id)
+            elif label_names:
+                # Markets listed under other names only; a page that showed no
+                # markets (slow load, props not posted yet) is tried again next run
+                name_index.mark_unmatched(slate, player_name)
+                report['players_unmatched'].append(player_name)
+                report['unmatched_seconds'] += time.monotonic() - player_started
+            if on_player_done is not None:
+                on_player_done(player_name, player_props, time.monotonic() - player_started)
+            if player_props:
+                all_fanduel_data[player_name] = player_props
+                print(f"  ✅ Captured {len(player_props)} props for {player_name}")
+            else:
+                print(f"  ⚠️  No relevant props found for {player_name}")
 
-        await browser.close()
-        print("\n✅ FanDuel browser closed.")
+        if browser is not None:
+            await browser.close()
+            print("\n✅ FanDuel browser closed.")
+            print(f"Resources: {resource_filter.summary()}")
+            report['resources'] = resource_filter.stats()
+    
+    if report['stopped_early']:
+        # Count the players we never got to, so the report covers the whole slate
+        async for player_name, _ in players:
+            if player_name not in skip_players and not name_index.is_unmatched(slate, player_name):
+                report['players_total'] += 1
+    
+    name_index.save(slate)
+    report['players_skipped'] = (
+        report['players_total'] - report['players_scraped'] - len(report['players_failed'])
+    )
+    report['elapsed_seconds'] = budget.elapsed()
+    
+    looked_up = sum(report['resolution'].values())
+    resolved = looked_up - report['resolution'].get('unresolved', 0)
+    print(f"\nName index: {resolved}/{looked_up} players resolved to a known FanDuel name {report['resolution']}")
+    if report['players_skipped_captured']:
+        print(f"Skipped {report['players_skipped_captured']} players already captured.")
+    if report['players_skipped_unmatched']:
+        print(f"Skipped {report['players_skipped_unmatched']} players with no FanDuel match earlier on this slate.")
+    
+    if report['stopped_early']:
+        print(f"\n🛑 Stopped early ({report['stopped_early']}). Returning partial results:")
+        print(f"   - Scraped: {report['players_scraped']}/{report['players_total']} players")
+        print(f"   - Failed: {len(report['players_failed'])}")
+        print(f"   - Not attempted: {report['players_skipped']}")
+    
+    if report['players_unmatched']:
+        print(f"\n🔎 {len(report['players_unmatched'])} players had no FanDuel match "
+              f"({report['unmatched_seconds']:.0f}s spent on them); they'll be skipped for the rest of this slate.")
     
-    print(f"\n📦 Successfully scraped FanDuel data for {len(all_fanduel_data)} players")
+    print(f"\n📦 Successfully scraped FanDuel data for {len(all_fanduel_data)} players in {report['elapsed_seconds']:.0f}s")
     return all_fanduel_data
@@ -0,0 +1,313 @@
+# job_queue.py
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import time
+from pathlib import Path
+
+QUEUE_FILE = Path(__file__).parent / "data" / "job_queue.sqlite3"
+
+# A claimed job belongs to its worker until the lease runs out. Workers renew
+# it before every player, so this only has to cover one player's retries.
+LEASE_SECONDS = 300
+
+# A job whose worker died or gave up this many times is marked failed
+MAX_ATTEMPTS = 3
+
+# Split the slate into one job per player or one per game (PrizePicks 'event')
+SHARD_BY = ('player', 'game')
+
+JOB_STATUSES = ('queued', 'leased', 'done', 'failed')
+
+# How often an idle worker checks whether a lease held by someone else expired
+POLL_SECONDS = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS slates (
+    slate TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    deadline REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    slate TEXT NOT NULL,
+    shard TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    elapsed_seconds REAL,
+    updated_at REAL NOT NULL,
+    UNIQUE (slate, shard)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (slate, status, id);
+"""
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def shard_props(props_by_player, shard_by='player'):
+    """
+    Split a PrizePicks slate into {shard: {player_name: props}}.
+    By game, a player is placed with the event of their first prop (players
+    without one get a shard of their own).
+    """
+    if shard_by not in SHARD_BY:
+        raise ValueError(f"Unknown shard_by {shard_by!r} (expected one of {', '.join(SHARD_BY)})")
+    shards = {}
+    for player_name, props in props_by_player.items():
+        event = next((prop['event'] for prop in props if prop.get('event') is not None), None)
+        if shard_by == 'player' or event is None:
+            shard = f"player:{player_name}"
+        else:
+            shard = f"game:{event}"
+        shards.setdefault(shard, {})[player_name] = props
+    return shards
+
+
+class JobQueue:
+    """
+    SQLite-backed scrape queue shared by a coordinator and worker processes.
+
+    The coordinator enqueues one job per shard of the slate, each carrying the
+    PrizePicks props of its players. Workers claim jobs under a lease, renew
+    it while they scrape and write the sportsbook props back. A job whose
+    lease runs out (worker killed, machine asleep) is handed to the next
+    worker that asks; a late result from the old owner is refused. Every
+    write is its own short transaction, so any number of processes on one
+    machine can share the file.
+    """
+
+    def __init__(self, path=QUEUE_FILE, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; claims take the write lock up front with BEGIN IMMEDIATE
+        self.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def enqueue(self, slate, shards, deadline):
+        """
+        Replace the slate's jobs with one per shard ({shard: {player: props}}).
+        `deadline` is a Unix time after which workers stop claiming and the
+        coordinator merges whatever is done. Returns the number of jobs.
+        """
+        now = time.time()
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.execute("DELETE FROM jobs WHERE slate = ?", (slate,))
+            self.db.execute(
+                "INSERT OR REPLACE INTO slates (slate, created_at, deadline) VALUES (?, ?, ?)",
+                (slate, now, deadline),
+            )
+            self.db.executemany(
+                "INSERT INTO jobs (slate, shard, payload, updated_at) VALUES (?, ?, ?, ?)",
+                [(slate, shard, json.dumps(players), now) for shard, players in shards.items()],
+            )
+        return len(shards)
+
+    def deadline(self, slate):
+        row = self.db.execute("SELECT deadline FROM slates WHERE slate = ?", (slate,)).fetchone()
+        return row['deadline'] if row else None
+
+    def claim(self, slate, worker_id):
+        """
+        Lease the next job: a queued one, or one whose lease has expired.
+        Returns {'id', 'shard', 'players', 'attempts'} or None.
+        """
+        now = time.time()
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            # Jobs whose workers vanished too often are given up on
+            self.db.execute(
+                "UPDATE jobs SET status = 'failed', error = 'lease expired', lease_owner = NULL, updated_at = ? "
+                "WHERE slate = ? AND status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, slate, now, self.max_attempts),
+            )
+            row = self.db.execute(
+                "SELECT id, shard, payload, attempts FROM jobs WHERE slate = ? AND "
+                "(status = 'queued' OR (status = 'leased' AND lease_expires < ?)) ORDER BY id LIMIT 1",
+                (slate, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute(
+                "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (worker_id, now + self.lease_seconds, now, row['id']),
+            )
+        return {
+            'id': row['id'],
+            'shard': row['shard'],
+            'players': json.loads(row['payload']),
+            'attempts': row['attempts'] + 1,
+        }
+
+    def renew(self, job_id, worker_id):
+        """Extend a lease; False if the job is no longer this worker's."""
+        now = time.time()
+        cursor = self.db.execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+            "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (now + self.lease_seconds, now, job_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, worker_id, result, elapsed_seconds):
+        """Store a job's result; False (and nothing written) if the lease was lost."""
+        cursor = self.db.execute(
+            "UPDATE jobs SET status = 'done', result = ?, elapsed_seconds = ?, lease_owner = NULL, "
+            "lease_expires = NULL, updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (json.dumps(result), round(elapsed_seconds, 3), time.time(), job_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def release(self, job_id, worker_id, error):
+        """Give a job back (worker stopping or job failed); failed for good after max_attempts."""
+        cursor = self.db.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+            "error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (self.max_attempts, error, time.time(), job_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def counts(self, slate):
+        """{status: number of jobs} for the slate (every status present)."""
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        for row in self.db.execute("SELECT status, COUNT(*) AS n FROM jobs WHERE slate = ? GROUP BY status", (slate,)):
+            counts[row['status']] = row['n']
+        return counts
+
+    def is_finished(self, slate):
+        counts = self.counts(slate)
+        return counts['queued'] == 0 and counts['leased'] == 0
+
+    def results(self, slate):
+        """
+        Merge the slate for analysis: (dfs_props, book_props, report).
+        dfs_props covers every enqueued player; book_props only finished jobs.
+        report['failed_players'] lists players whose scrape raised in a job
+        that otherwise finished.
+        """
+        dfs_props, book_props = {}, {}
+        report = {
+            'jobs': self.counts(slate),
+            'workers': {},
+            'failed_shards': {},
+            'unfinished_shards': [],
+            'failed_players': [],
+        }
+        rows = self.db.execute(
+            "SELECT shard, payload, status, result, error, elapsed_seconds, lease_owner FROM jobs "
+            "WHERE slate = ? ORDER BY id",
+            (slate,),
+        )
+        for row in rows:
+            dfs_props.update(json.loads(row['payload']))
+            if row['status'] == 'done':
+                result = json.loads(row['result'])
+                book_props.update(result['props'])
+                report['failed_players'].extend(result.get('failed', []))
+                worker = report['workers'].setdefault(result['worker'], {'jobs': 0, 'seconds': 0.0})
+                worker['jobs'] += 1
+                worker['seconds'] = round(worker['seconds'] + row['elapsed_seconds'], 3)
+            elif row['status'] == 'failed':
+                report['failed_shards'][row['shard']] = row['error']
+            else:
+                report['unfinished_shards'].append(row['shard'])
+        return dfs_props, book_props, report
+
+
+async def run_worker(queue, slate, source, worker_id=None, source_report=None, poll_seconds=POLL_SECONDS):
+    """
+    Claim the slate's jobs one at a time and price their players with a
+    sportsbook `source` until the queue is drained or the deadline passes.
+
+    The claimed players are fed to a single source.fetch() call as its
+    player stream, so a browser-backed source keeps one session across jobs.
+    A job is completed once the source asks for the player after its last
+    one, along with the players the source gave up on
+    (source_report['players_failed']). If the source stops early
+    (source_report['stopped_early'], set by the FanDuel scraper) or raises,
+    the job in flight is released for another worker. Returns this worker's
+    counters; 'players' counts only players that came back with props.
+    """
+    worker_id = worker_id or default_worker_id()
+    source_report = {} if source_report is None else source_report
+    stats = {
+        'worker': worker_id, 'jobs_done': 0, 'jobs_released': 0, 'jobs_lost': 0,
+        'players': 0, 'players_failed': 0,
+    }
+    captured = {}
+    in_flight = None
+
+    def on_props(player_name, props):
+        captured[player_name] = props
+
+    async def players():
+        nonlocal in_flight
+        while True:
+            deadline = queue.deadline(slate)
+            if deadline is None or time.time() >= deadline:
+                print(f"⏰ [{worker_id}] Deadline reached, not claiming more jobs")
+                return
+            job = queue.claim(slate, worker_id)
+            if job is None:
+                if queue.is_finished(slate):
+                    return
+                # Other workers hold the rest; their leases may still expire
+                await asyncio.sleep(poll_seconds)
+                continue
+
+            in_flight, started = job, time.monotonic()
+            captured.clear()
+            failed_before = len(source_report.get('players_failed', ()))
+            print(f"\n📋 [{worker_id}] Claimed {job['shard']} ({len(job['players'])} players, attempt {job['attempts']})")
+            for player_name, props in job['players'].items():
+                if not queue.renew(job['id'], worker_id):
+                    break
+                yield player_name, props
+                if source_report.get('stopped_early'):
+                    # The source is only draining the stream now; let another worker redo this job
+                    queue.release(job['id'], worker_id, f"worker stopped: {source_report['stopped_early']}")
+                    stats['jobs_released'] += 1
+                    in_flight = None
+                    return
+            else:
+                failed = [
+                    name for name in source_report.get('players_failed', [])[failed_before:]
+                    if name in job['players']
+                ]
+                result = {'worker': worker_id, 'props': dict(captured), 'failed': failed}
+                if queue.complete(job['id'], worker_id, result, time.monotonic() - started):
+                    stats['jobs_done'] += 1
+                    stats['players'] += len(captured)
+                    stats['players_failed'] += len(failed)
+                    in_flight = None
+                    continue
+            print(f"⚠️  [{worker_id}] Lease on {job['shard']} expired and was taken over, dropping its results")
+            stats['jobs_lost'] += 1
+            in_flight = None
+
+    try:
+        await source.fetch(players(), on_props)
+    finally:
+        if in_flight is not None and queue.release(in_flight['id'], worker_id, "worker exited"):
+            stats['jobs_released'] += 1
+    return stats
@@ -1,120 +1,36 @@
 # main.py
 
 import asyncio
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
-from prizepicks_scraper import fetch_props as fetch_prizepicks_props
-from fanduel_scraper import fetch_odds as fetch_fanduel_odds
+import json
+import time
 
-# Initialize FastAPI app
-app = FastAPI(
-    title="PropShop +EV Analyzer",
-    description="Real-time sports betting edge finder using PrizePicks and FanDuel data",
-    version="1.0.0"
+# The pricing/analysis core lives in analysis.py (no third-party imports);
+# it is re-exported here for code that imports it from main.
+from analysis import (
+    BET_TYPES,
+    BET_TYPE_TABLE,
+    MAX_PROP_ROW_BYTES,
+    american_to_probability,
+    calculate_no_vig_probability,
+    evaluate_props,
+    find_plus_ev_opportunities,
+    format_opportunities_for_dashboard,
+    load_bet_types,
+    qualifying_bets,
 )
+from opportunity_index import OpportunityIndex, QueryError, StaleCursor
 
-# Enable CORS for frontend access
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://localhost:3001"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# FastAPI, uvicorn and the Playwright scrapers are imported inside the
+# functions that need them, so the CLI and anything importing the math from
+# here don't pay for the web stack at startup.
 
-# PrizePicks payout structures and minimum win % thresholds
-BET_TYPES = {
-    "2-Pick Power": {"payout": 3, "min_win_pct": 57.74, "type": "power"},
-    "3-Pick Power": {"payout": 6, "min_win_pct": 55.05, "type": "power"},
-    "4-Pick Power": {"payout": 10, "min_win_pct": 56.23, "type": "power"},
-    "5-Pick Power": {"payout": 20, "min_win_pct": 54.93, "type": "power"},
-    "6-Pick Power": {"payout": 37.5, "min_win_pct": 54.66, "type": "power"},
-    "3-Pick Flex": {"payout": 3, "min_win_pct": 57.74, "type": "flex"},
-    "4-Pick Flex": {"payout": 6, "min_win_pct": 55.04, "type": "flex"},
-    "5-Pick Flex": {"payout": 10, "min_win_pct": 54.26, "type": "flex"},
-    "6-Pick Flex": {"payout": 25, "min_win_pct": 54.21, "type": "flex"},
-}
+# /api/analyze reuses its last result while the PrizePicks payload is unchanged,
+# up to this age (FanDuel lines still move underneath an unchanged slate)
+ANALYSIS_MAX_AGE = 15 * 60  # seconds
+last_analysis = {'payload_hash': None, 'computed_at': 0.0, 'result': None, 'index': None}
 
-def american_to_probability(odds):
-    """Convert American odds to implied probability percentage."""
-    if odds > 0:
-        return 100 / (odds + 100) * 100
-    else:
-        return abs(odds) / (abs(odds) + 100) * 100
-
-def calculate_no_vig_probability(over_odds, under_odds):
-    """
-    Calculate the true (no-vig) probability from FanDuel's Over/Under odds.
-    Removes the bookmaker's vig to get fair market probability.
-    """
-    over_prob = american_to_probability(over_odds)
-    under_prob = american_to_probability(under_odds)
-    total_prob = over_prob + under_prob
-    
-    # Remove vig and normalize
-    no_vig_over = (over_prob / total_prob) * 100
-    no_vig_under = (under_prob / total_prob) * 100
-    
-    return no_vig_over, no_vig_under
-
-def find_plus_ev_opportunities(fanduel_odds):
-    """
-    Analyze FanDuel odds to find +EV opportunities for PrizePicks.
-    Returns a dict of player -> [{prop info, recommended bets}]
-    """
-    opportunities = {}
-    
-    for player, props in fanduel_odds.items():
-        player_opps = []
-        
-        for prop in props:
-            stat = prop['stat']
-            line = prop['line']
-            over_odds = prop['over_odds']
-            under_odds = prop['under_odds']
-            
-            # Calculate no-vig probabilities
-            no_vig_over, no_vig_under = calculate_no_vig_probability(over_odds, under_odds)
-            
-            # Check which bet types this prop qualifies for (Over)
-            over_qualifies = []
-            for bet_name, bet_info in BET_TYPES.items():
-                if no_vig_over >= bet_info['min_win_pct']:
-                    edge = no_vig_over - bet_info['min_win_pct']
-                    over_qualifies.append({
-                        'bet_type': bet_name,
-                        'edge': edge,
-                        'payout': bet_info['payout']
-                    })
-            
-            # Check which bet types this prop qualifies for (Under)
-            under_qualifies = []
-            for bet_name, bet_info in BET_TYPES.items():
-                if no_vig_under >= bet_info['min_win_pct']:
-                    edge = no_vig_under - bet_info['min_win_pct']
-                    under_qualifies.append({
-                        'bet_type': bet_name,
-                        'edge': edge,
-                        'payout': bet_info['payout']
-                    })
-            
-            if over_qualifies or under_qualifies:
-                player_opps.append({
-                    'stat': stat,
-                    'line': line,
-                    'over_odds': over_odds,
-                    'under_odds': under_odds,
-                    'no_vig_over': no_vig_over,
-                    'no_vig_under': no_vig_under,
-                    'over_qualifies': over_qualifies,
-                    'under_qualifies': under_qualifies
-                })
-        
-        if player_opps:
-            opportunities[player] = player_opps
-    
-    return opportunities
+# Rows evaluated (and streamed back) per chunk by /api/evaluate
+EVALUATE_CHUNK_SIZE = 5000
 
 def display_opportunities(opportunities):
     """Display +EV opportunities in a clear format."""
@@ -145,29 +61,84 @@ def display_opportunities(opportunities):
             # Display Over recommendations
             if prop['over_qualifies']:
                 print(f"\n   ✅ OVER Recommendations:")
-                for qual in sorted(prop['over_qualifies'], key=lambda x: x['edge'], reverse=True):
+                for qual in prop['over_qualifies']:
                     print(f"      • {qual['bet_type']}: +{qual['edge']:.2f}% edge (pays {qual['payout']}x)")
             
             # Display Under recommendations
             if prop['under_qualifies']:
                 print(f"\n   ✅ UNDER Recommendations:")
-                for qual in sorted(prop['under_qualifies'], key=lambda x: x['edge'], reverse=True):
+                for qual in prop['under_qualifies']:
                     print(f"      • {qual['bet_type']}: +{qual['edge']:.2f}% edge (pays {qual['payout']}x)")
             
             print()
 
-@app.get("/api/analyze")
-async def analyze_opportunities():
+async def analyze_opportunities(sport: str = None, stat: str = None, bet_type: str = None,
+                                min_edge: float = None, direction: str = None, sort: str = None,
+                                limit: int = None, cursor: str = None):
     """
     API endpoint that runs the full analysis pipeline:
     1. Fetches props from PrizePicks
-    2. Fetches odds from FanDuel
+    2. Fetches odds from FanDuel (pipelined behind PrizePicks, see sources.py)
     3. Analyzes for +EV opportunities
     4. Returns formatted JSON for the dashboard
+    
+    Without query parameters every opportunity is returned. With any of
+    sport/stat/bet_type/min_edge/direction/sort/limit/cursor, the response
+    holds one page (answered from the OpportunityIndex built for this
+    result) plus a `next_cursor` for the following page.
     """
+    from fastapi import HTTPException
+    
+    result = await get_analysis()
+    
+    params = (sport, stat, bet_type, min_edge, direction, sort, limit, cursor)
+    if all(param is None for param in params):
+        return result
+    
     try:
-        # Fetch data from both sources
-        prizepicks_props = await fetch_prizepicks_props()
+        page = last_analysis['index'].query(
+            sport=sport, stat=stat, bet_type=bet_type, direction=direction,
+            min_edge=min_edge, sort=sort, limit=limit, cursor=cursor,
+        )
+    except StaleCursor as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {**result, **page}
+
+async def get_analysis():
+    """Latest dashboard result, recomputed unless the slate is unchanged and recent."""
+    from fastapi import HTTPException
+    from prizepicks_scraper import get_projections_cache
+    from dedup import dedupe_props, record_analysis_time
+    from sources import build_sources, gather_props
+    
+    try:
+        def reusable(payload_hash):
+            return (
+                last_analysis['result'] is not None
+                and payload_hash == last_analysis['payload_hash']
+                and time.time() - last_analysis['computed_at'] < ANALYSIS_MAX_AGE
+            )
+        
+        # Cached slate within its TTL: nothing to fetch, don't even start the browsers
+        projections_cache = get_projections_cache()
+        if projections_cache.is_fresh() and reusable(projections_cache.payload_hash):
+            return last_analysis['result']
+        
+        # Fetch data from all sources; sportsbooks start on players as the slate
+        # arrives and are cancelled if it turns out unchanged
+        reuse = {'payload_hash': None, 'cached': False}
+        
+        def keep_pricing(dfs_props):
+            reuse['payload_hash'] = projections_cache.payload_hash
+            reuse['cached'] = bool(dfs_props) and reusable(reuse['payload_hash'])
+            return not reuse['cached']
+        
+        prizepicks_props, fanduel_odds = await gather_props(
+            build_sources('dfs'), build_sources('sportsbook'), keep_pricing=keep_pricing
+        )
         
         if not prizepicks_props:
             raise HTTPException(
@@ -175,7 +146,9 @@ async def analyze_opportunities():
                 detail="Could not fetch PrizePicks data (CAPTCHA or network error)"
             )
         
-        fanduel_odds = await fetch_fanduel_odds(prizepicks_props)
+        if reuse['cached']:
+            return last_analysis['result']
+        payload_hash = reuse['payload_hash']
         
         if not fanduel_odds:
             raise HTTPException(
@@ -183,94 +156,214 @@ async def analyze_opportunities():
                 detail="Could not fetch FanDuel odds"
             )
         
-        # Analyze for +EV opportunities
+        # One prop per market, then analyze for +EV opportunities
+        dedup_report = {}
+        fanduel_odds = dedupe_props(fanduel_odds, prizepicks_props, dedup_report)
+        analysis_started = time.perf_counter()
         opportunities = find_plus_ev_opportunities(fanduel_odds)
+        record_analysis_time(dedup_report, time.perf_counter() - analysis_started)
         
         # Format for dashboard
-        formatted_opps = []
-        opp_id = 1
-        
-        for player, props in opportunities.items():
-            for prop in props:
-                # Determine best direction (Over or Under)
-                best_over = max(prop['over_qualifies'], key=lambda x: x['edge']) if prop['over_qualifies'] else None
-                best_under = max(prop['under_qualifies'], key=lambda x: x['edge']) if prop['under_qualifies'] else None
-                
-                if best_over and (not best_under or best_over['edge'] >= best_under['edge']):
-                    direction = 'over'
-                    best_bet = best_over
-                    all_qualifies = prop['over_qualifies']
-                    win_pct = prop['no_vig_over']
-                else:
-                    direction = 'under'
-                    best_bet = best_under
-                    all_qualifies = prop['under_qualifies']
-                    win_pct = prop['no_vig_under']
-                
-                formatted_opps.append({
-                    'id': opp_id,
-                    'player': player,
-                    'stat': prop['stat'],
-                    'line': prop['line'],
-                    'direction': direction,
-                    'odds': prop['over_odds'] if direction == 'over' else prop['under_odds'],
-                    'no_vig_win_pct': round(win_pct, 2),
-                    'edge': round(best_bet['edge'], 2),
-                    'best_bet_type': best_bet['bet_type'],
-                    'payout': best_bet['payout'],
-                    'all_qualifying_bets': [
-                        {
-                            'type': q['bet_type'],
-                            'edge': round(q['edge'], 2),
-                            'payout': q['payout']
-                        } for q in sorted(all_qualifies, key=lambda x: x['edge'], reverse=True)
-                    ]
-                })
-                opp_id += 1
-        
-        # Calculate stats
-        total_props_scanned = sum(len(props) for props in fanduel_odds.values())
-        total_plus_ev = len(formatted_opps)
-        avg_edge = sum(opp['edge'] for opp in formatted_opps) / total_plus_ev if total_plus_ev > 0 else 0
-        best_edge = max((opp['edge'] for opp in formatted_opps), default=0)
+        result = format_opportunities_for_dashboard(opportunities, fanduel_odds)
+        result['stats']['dedup'] = dedup_report
+        result['timestamp'] = None  # Frontend will set this
         
-        return {
-            'opportunities': formatted_opps,
-            'stats': {
-                'total_scanned': total_props_scanned,
-                'plus_ev_found': total_plus_ev,
-                'conversion_rate': round((total_plus_ev / total_props_scanned * 100), 2) if total_props_scanned > 0 else 0,
-                'avg_edge': round(avg_edge, 2),
-                'best_edge': round(best_edge, 2)
-            },
-            'timestamp': None  # Frontend will set this
-        }
+        # Sorted indexes for filtered/paged queries, built once per result
+        computed_at = time.time()
+        result['version'] = f"{int(computed_at * 1000)}-{(payload_hash or '')[:12]}"
+        index = OpportunityIndex(result['opportunities'], result['version'])
+        last_analysis.update(payload_hash=payload_hash, computed_at=computed_at, result=result, index=index)
+        return result
     
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis error: {str(e)}")
 
-@app.get("/")
+async def iter_ndjson_chunks(byte_stream, chunk_size=EVALUATE_CHUNK_SIZE, max_line=MAX_PROP_ROW_BYTES):
+    """
+    Split an incoming NDJSON byte stream into lists of raw lines as it
+    arrives. The stream is only read when the next chunk is wanted, so at
+    most one chunk of rows (plus one read) is held. A line longer than
+    `max_line` is cut short (parse_prop_row rejects it) and the rest of it
+    is skipped rather than buffered.
+    """
+    buffer = b''
+    skipping = False  # inside the remainder of a cut line
+    rows = []
+    async for data in byte_stream:
+        buffer += data
+        lines = buffer.split(b'\n')
+        buffer = lines.pop()
+        if skipping and lines:
+            del lines[0]
+            skipping = False
+        rows.extend(line for line in lines if line.strip())
+        if len(buffer) > max_line:
+            if not skipping:
+                rows.append(buffer[:max_line + 1])
+                skipping = True
+            buffer = b''
+        while len(rows) >= chunk_size:
+            yield rows[:chunk_size]
+            rows = rows[chunk_size:]
+    if buffer.strip() and not skipping:
+        rows.append(buffer)
+    if rows:
+        yield rows
+
+async def iter_list_chunks(rows, chunk_size=EVALUATE_CHUNK_SIZE):
+    for start in range(0, len(rows), chunk_size):
+        yield rows[start:start + chunk_size]
+
+async def stream_evaluation(chunks, only_plus_ev=False):
+    """Evaluate each chunk as it arrives and yield its results as NDJSON."""
+    index = 0
+    async for rows in chunks:
+        lines = []
+        for result in evaluate_props(rows, index):
+            if only_plus_ev and 'error' not in result and not (result['over_qualifies'] or result['under_qualifies']):
+                continue
+            lines.append(json.dumps(result))
+        index += len(rows)
+        if lines:
+            yield '\n'.join(lines) + '\n'
+        # Let other requests run between chunks
+        await asyncio.sleep(0)
+
+async def evaluate_odds(request, only_plus_ev=False):
+    """
+    API endpoint that runs the +EV analysis on user-supplied odds.
+    
+    Accepts rows of (player, stat, line, over_odds, under_odds), as objects or
+    arrays, either as a JSON array / {"rows": [...]} body or as an NDJSON
+    stream (Content-Type: application/x-ndjson). Results stream back as
+    NDJSON, one line per row, in chunks of EVALUATE_CHUNK_SIZE, so the
+    response is never held in memory; an NDJSON upload is evaluated while it
+    is still arriving. Bad rows come back as {"row", "error"}.
+    """
+    from fastapi import HTTPException
+    from fastapi.responses import StreamingResponse
+    
+    content_type = request.headers.get('content-type', '')
+    if 'ndjson' in content_type or 'jsonl' in content_type:
+        # Each chunk is parsed and answered as it arrives. The response's
+        # disconnect listener reads from the same ASGI channel as
+        # request.stream() (and would swallow body messages), so it only
+        # starts once the upload has been read to the end.
+        upload_done = asyncio.Event()
+        
+        async def upload():
+            try:
+                async for data in request.stream():
+                    yield data
+            finally:
+                upload_done.set()
+        
+        class UploadStreamingResponse(StreamingResponse):
+            async def listen_for_disconnect(self, receive):
+                await upload_done.wait()
+                await super().listen_for_disconnect(receive)
+        
+        chunks = iter_ndjson_chunks(upload())
+        response_class = UploadStreamingResponse
+    else:
+        try:
+            payload = json.loads(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+        rows = payload.get('rows') if isinstance(payload, dict) else payload
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail='Expected a JSON array of rows or {"rows": [...]}')
+        chunks = iter_list_chunks(rows)
+        response_class = StreamingResponse
+    
+    return response_class(stream_evaluation(chunks, only_plus_ev), media_type='application/x-ndjson')
+
+async def cache_stats():
+    """PrizePicks projections cache age and hit rate."""
+    from prizepicks_scraper import get_projections_cache
+    
+    return {
+        'projections': get_projections_cache().stats(),
+        'analysis_age_seconds': round(time.time() - last_analysis['computed_at'], 1) if last_analysis['result'] else None,
+    }
+
 async def root():
     """Health check endpoint."""
     return {
         'status': 'online',
         'service': 'PropShop +EV Analyzer',
         'endpoints': {
-            '/api/analyze': 'Run full analysis pipeline',
+            '/api/analyze': 'Run full analysis pipeline (filters: sport, stat, bet_type, min_edge, direction; sort, limit, cursor)',
+            '/api/cache': 'Projections cache age and hit rate',
+            '/api/evaluate': 'POST odds rows (JSON or NDJSON) for +EV analysis',
             '/docs': 'Interactive API documentation'
         }
     }
 
+def create_app():
+    """Build the FastAPI app and register the API routes."""
+    from fastapi import FastAPI, Request
+    from fastapi.middleware.cors import CORSMiddleware
+    from profiling import Profiler
+    
+    app = FastAPI(
+        title="PropShop +EV Analyzer",
+        description="Real-time sports betting edge finder using PrizePicks and FanDuel data",
+        version="1.0.0"
+    )
+    
+    # Enable CORS for frontend access
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:3000", "http://localhost:3001"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    
+    # Opt-in profiling hooks (PROPSHOP_PROFILE=1); when off, nothing is wrapped or registered
+    profiler = Profiler.from_env()
+    
+    app.get("/api/analyze")(profiler.wrap_endpoint(analyze_opportunities) if profiler else analyze_opportunities)
+    app.get("/api/cache")(cache_stats)
+    app.get("/")(root)
+    if profiler:
+        profiler.install(app)
+    
+    # Needs the Request annotation, which only exists once FastAPI is imported
+    @app.post("/api/evaluate")
+    async def evaluate(request: Request, only_plus_ev: bool = False):
+        return await evaluate_odds(request, only_plus_ev)
+    
+    return app
+
+def __getattr__(name):
+    # Keeps `uvicorn main:app` working: the app is built on first access
+    if name == "app":
+        app = create_app()
+        globals()['app'] = app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 async def main():
     """
     Main function to run all scrapers and process the data.
     """
+    from dedup import dedupe_props, print_dedup_report, record_analysis_time
+    from sources import build_sources, gather_props, print_source_report
+    
     print("--- Starting Value Finder ---")
 
-    # Step 1: Fetch props from PrizePicks (async)
-    prizepicks_props_by_player = await fetch_prizepicks_props()
+    # Steps 1-2: Fetch props from PrizePicks and odds from FanDuel. FanDuel
+    # searches each player as soon as PrizePicks has parsed its props.
+    fetch_report = {}
+    prizepicks_props_by_player, fanduel_odds = await gather_props(
+        build_sources('dfs'), build_sources('sportsbook'), fetch_report
+    )
+    print("\n📡 Sources:")
+    print_source_report(fetch_report)
 
     if not prizepicks_props_by_player or prizepicks_props_by_player is None:
         print("\n❌ Could not fetch props from PrizePicks (CAPTCHA failure or network error).")
@@ -282,9 +375,6 @@ async def main():
         return
 
     print(f"\nSuccessfully fetched props for {len(prizepicks_props_by_player)} players from PrizePicks.")
-    
-    # Step 2: Fetch odds from FanDuel (async)
-    fanduel_odds = await fetch_fanduel_odds(prizepicks_props_by_player)
 
     if not fanduel_odds:
         print("\n⚠️  Could not fetch odds from FanDuel. Comparison will be skipped.")
@@ -303,10 +393,15 @@ async def main():
             print(f"    Examples: {', '.join(list(common_players)[:3])}")
 
 
-    # Step 3: Analyze for +EV opportunities
+    # Step 3: Analyze each unique prop for +EV opportunities
     if fanduel_odds:
         print("\n--- Analyzing for +EV Opportunities ---")
+        dedup_report = {}
+        fanduel_odds = dedupe_props(fanduel_odds, prizepicks_props_by_player, dedup_report)
+        analysis_started = time.perf_counter()
         opportunities = find_plus_ev_opportunities(fanduel_odds)
+        record_analysis_time(dedup_report, time.perf_counter() - analysis_started)
+        print_dedup_report(dedup_report)
         display_opportunities(opportunities)
     
     print("\n" + "="*80)
@@ -323,7 +418,8 @@ if __name__ == "__main__":
         print("📊 Dashboard: http://localhost:3000")
         print("🔧 API Docs: http://localhost:5001/docs")
         print("⚡ API Endpoint: http://localhost:5001/api/analyze\n")
-        uvicorn.run(app, host="0.0.0.0", port=5001)
+        import uvicorn
+        uvicorn.run(create_app(), host="0.0.0.0", port=5001)
     else:
         # Run as CLI tool
         asyncio.run(main())
\ No newline at end of file
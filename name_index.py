@@ -0,0 +1,190 @@
+# name_index.py
+
+import difflib
+import fcntl
+import json
+import os
+import re
+import unicodedata
+from pathlib import Path
+
+NAME_INDEX_FILE = Path.home() / ".propshop" / "name_index.json"
+
+# Generational suffixes that books include or drop inconsistently
+NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+
+# Minimum difflib ratio for a fuzzy match between normalized names. A ratio
+# alone can't tell teammates apart ("Jalen Williams" / "Jaylin Williams" is
+# 0.90), so fuzzy matches must also be a plausible variant of the same name
+# (see is_name_variant).
+FUZZY_CUTOFF = 0.92
+
+
+def normalize_name(name):
+    """
+    Canonical lookup key for a player name:
+    "C.J. Stroud" / "CJ Stroud" -> "cj stroud", "Jaren Jackson Jr." -> "jaren jackson",
+    "Nikola Jokić" -> "nikola jokic".
+    """
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(ch for ch in name if not unicodedata.combining(ch))
+    name = name.lower().replace(".", "").replace("'", "").replace("’", "")
+    tokens = [t for t in re.split(r"[\s\-]+", name) if t and t not in NAME_SUFFIXES]
+    return " ".join(tokens)
+
+
+def surname_token(name):
+    """Last name as shown (suffix dropped), used to find a player's markets on the page."""
+    tokens = [t for t in name.split() if t.lower().rstrip(".") not in NAME_SUFFIXES]
+    return tokens[-1] if tokens else name
+
+
+def is_name_variant(key, other):
+    """
+    Whether two normalized names can be the same player: same surname with
+    one first name shortening the other ("nic claxton" / "nicolas claxton"),
+    or the same first name with a near-identical surname. Different first
+    names with the same surname ("jalen" / "jaylin williams") are not.
+    """
+    first, _, last = key.rpartition(" ")
+    other_first, _, other_last = other.rpartition(" ")
+    first, other_first = first.replace(" ", ""), other_first.replace(" ", "")
+    if last == other_last:
+        return bool(first and other_first) and (first.startswith(other_first) or other_first.startswith(first))
+    return first == other_first and difflib.SequenceMatcher(None, last, other_last).ratio() >= FUZZY_CUTOFF
+
+
+def fuzzy_match(key, candidate_keys):
+    """Closest candidate that is a plausible variant of `key`, or None."""
+    best, best_ratio = None, 0.0
+    for candidate in candidate_keys:
+        if is_name_variant(key, candidate):
+            ratio = difflib.SequenceMatcher(None, key, candidate).ratio()
+            if ratio > best_ratio:
+                best, best_ratio = candidate, ratio
+    return best
+
+
+def match_label_name(wanted_names, label_names):
+    """
+    Pick which of the player names seen in market labels belongs to our
+    player: exact normalized match first (in `wanted_names` order), then
+    fuzzy. Returns the label name or None.
+    """
+    wanted_keys = [normalize_name(n) for n in wanted_names]
+    by_label_key = {normalize_name(n): n for n in label_names}
+    for key in wanted_keys:
+        if key in by_label_key:
+            return by_label_key[key]
+    for key in wanted_keys:
+        close = fuzzy_match(key, by_label_key)
+        if close is not None:
+            return by_label_key[close]
+    return None
+
+
+class NameIndex:
+    """
+    Maps PrizePicks players to the names the sportsbook uses.
+
+    Lookups go: PrizePicks player ID -> manual alias -> exact normalized name
+    -> fuzzy match against names the sportsbook has shown us before. A fuzzy
+    result is only a search hint; names are pinned by player ID (learn())
+    once a market label has confirmed them. The index is persisted between
+    runs; players whose markets showed up under no recognisable name are
+    remembered for the current slate so they aren't searched again.
+    """
+
+    def __init__(self, path=NAME_INDEX_FILE):
+        self.path = Path(path)
+        self.by_id = {}        # PrizePicks player ID -> sportsbook name
+        self.by_key = {}       # normalized name -> sportsbook name (as seen on the book)
+        self.aliases = {}      # normalized PrizePicks name -> sportsbook name (hand-maintained or learned)
+        self.unmatched = {}    # slate -> {PrizePicks display names}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.by_id = saved.get('by_id', {})
+        self.by_key = saved.get('by_key', {})
+        self.aliases = {normalize_name(k): v for k, v in saved.get('aliases', {}).items()}
+        self.unmatched = {slate: set(names) for slate, names in saved.get('unmatched', {}).items()}
+
+    def save(self, slate=None):
+        """
+        Write the index, keeping entries other processes (scrape workers) saved
+        since we loaded it; ours win where both know a name. With `slate`,
+        unmatched players remembered for other slates are dropped. A lock
+        file serializes the read-merge-replace across processes.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_name(self.path.name + ".lock"), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            saved = NameIndex(self.path)
+            self.by_id = {**saved.by_id, **self.by_id}
+            self.by_key = {**saved.by_key, **self.by_key}
+            self.aliases = {**saved.aliases, **self.aliases}
+            for saved_slate, names in saved.unmatched.items():
+                self.unmatched.setdefault(saved_slate, set()).update(names)
+            if slate is not None:
+                self.unmatched = {slate: self.unmatched.get(slate, set())}
+            tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'by_id': self.by_id,
+                    'by_key': self.by_key,
+                    'aliases': self.aliases,
+                    'unmatched': {slate: sorted(names) for slate, names in self.unmatched.items()},
+                }, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def resolve(self, display_name, player_id=None):
+        """
+        Return (sportsbook_name, method) for a PrizePicks player. Nothing is
+        stored; 'fuzzy' results in particular are guesses to search with.
+        """
+        if player_id is not None and player_id in self.by_id:
+            return self.by_id[player_id], 'id'
+
+        key = normalize_name(display_name)
+        if key in self.aliases:
+            name, method = self.aliases[key], 'alias'
+        elif key in self.by_key:
+            name, method = self.by_key[key], 'exact'
+        else:
+            close = fuzzy_match(key, self.by_key)
+            if close is None:
+                return display_name, 'unresolved'
+            name, method = self.by_key[close], 'fuzzy'
+        return name, method
+
+    def build(self, props_by_player):
+        """
+        Resolve every player on a slate up front.
+        Returns {display_name: (sportsbook_name, method)}.
+        """
+        resolutions = {}
+        for display_name, props in props_by_player.items():
+            player_id = props[0].get('player_id') if props else None
+            resolutions[display_name] = self.resolve(display_name, player_id)
+        return resolutions
+
+    def learn(self, sportsbook_name, display_name=None, player_id=None):
+        """Record a name the sportsbook actually uses (and who it belongs to)."""
+        self.by_key[normalize_name(sportsbook_name)] = sportsbook_name
+        if display_name is not None:
+            key = normalize_name(display_name)
+            if key != normalize_name(sportsbook_name):
+                self.aliases[key] = sportsbook_name
+        if player_id is not None:
+            self.by_id[player_id] = sportsbook_name
+
+    def mark_unmatched(self, slate, display_name):
+        self.unmatched.setdefault(slate, set()).add(display_name)
+
+    def is_unmatched(self, slate, display_name):
+        return display_name in self.unmatched.get(slate, ())
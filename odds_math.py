@@ -0,0 +1,227 @@
+# odds_math.py
+"""
+Batch odds conversion: American, decimal and fractional odds to implied and
+no-vig win probabilities (in percent, like analysis.american_to_probability).
+
+Every function takes a sequence of odds and converts it in one call. The
+default float mode returns array('d') for speed; exact=True returns lists of
+fractions.Fraction, computed without rounding, for auditing a price.
+
+Prices on a slate repeat heavily (a few thousand distinct American odds cover
+millions of props), so when a sample of the batch shows repeats each distinct
+price is converted once and the batch is filled in from that table with map().
+Standard library only.
+"""
+
+from array import array
+from fractions import Fraction
+from itertools import repeat
+from math import isfinite
+from operator import add, truediv
+
+ODDS_FORMATS = ('american', 'decimal', 'fractional')
+
+# Prices sampled (evenly spaced) to decide whether a lookup table pays off.
+# With mostly distinct prices a table is pure overhead: a million-entry dict
+# is ~4x slower to build than converting each price directly.
+TABLE_SAMPLE_SIZE = 8192
+
+
+def _finite(value):
+    """float(value), refusing NaN and infinities (including overflowing strings like "1e999")."""
+    try:
+        number = float(value)
+    except OverflowError:
+        number = float('inf')
+    if not isfinite(number):
+        raise ValueError(f"Invalid odds {value!r} (must be finite)")
+    return number
+
+
+def _american_float(value):
+    if isinstance(value, str):
+        value = value.strip().replace('\u2212', '-')
+    odds = _finite(value)
+    if -100 < odds < 100:
+        raise ValueError(f"Invalid American odds {value!r} (must be <= -100 or >= +100)")
+    return 10000 / (odds + 100) if odds > 0 else -100 * odds / (100 - odds)
+
+
+def _decimal_float(value):
+    odds = _finite(value)
+    if odds <= 1:
+        raise ValueError(f"Invalid decimal odds {value!r} (must be greater than 1)")
+    return 100 / odds
+
+
+def _fractional_float(value):
+    if isinstance(value, str):
+        num, _, den = value.strip().partition('/')
+        num, den = _finite(num), _finite(den or 1)
+    elif isinstance(value, tuple):
+        num, den = _finite(value[0]), _finite(value[1])
+    elif isinstance(value, Fraction):
+        num, den = _finite(value.numerator), _finite(value.denominator)
+    else:
+        num, den = _finite(value), 1.0
+    if num < 0 or den <= 0:
+        raise ValueError(f"Invalid fractional odds {value!r} (must be non-negative with a positive denominator)")
+    return 100 * den / (num + den)
+
+
+def _exact(value):
+    """
+    Fraction from an int, numeric string or float (floats via their shortest
+    repr). Values float mode can't represent are refused here too, so both
+    modes reject the same input.
+    """
+    if isinstance(value, str):
+        value = value.strip().replace('\u2212', '-')
+    _finite(value)
+    if isinstance(value, float):
+        return Fraction(repr(value))
+    return Fraction(value)
+
+
+def _american_exact(value):
+    odds = _exact(value)
+    if -100 < odds < 100:
+        raise ValueError(f"Invalid American odds {value!r} (must be <= -100 or >= +100)")
+    # Built from numerator/denominator so Fraction normalizes once
+    p, q = odds.numerator, odds.denominator
+    return Fraction(10000 * q, p + 100 * q) if p > 0 else Fraction(-100 * p, 100 * q - p)
+
+
+def _decimal_exact(value):
+    odds = _exact(value)
+    if odds <= 1:
+        raise ValueError(f"Invalid decimal odds {value!r} (must be greater than 1)")
+    return Fraction(100 * odds.denominator, odds.numerator)
+
+
+def _fractional_exact(value):
+    if isinstance(value, str):
+        num, _, den = value.strip().partition('/')
+        num, den = _exact(num), _exact(den or 1)
+    elif isinstance(value, tuple):
+        num, den = _exact(value[0]), _exact(value[1])
+    else:
+        odds = _exact(value)
+        num, den = Fraction(odds.numerator), Fraction(odds.denominator)
+    if num < 0 or den <= 0:
+        raise ValueError(f"Invalid fractional odds {value!r} (must be non-negative with a positive denominator)")
+    return 100 * den / (num + den)
+
+
+# (format, exact) -> per-price converter
+_CONVERTERS = {
+    ('american', False): _american_float,
+    ('decimal', False): _decimal_float,
+    ('fractional', False): _fractional_float,
+    ('american', True): _american_exact,
+    ('decimal', True): _decimal_exact,
+    ('fractional', True): _fractional_exact,
+}
+
+
+def _converter(fmt, exact):
+    converter = _CONVERTERS.get((fmt, bool(exact)))
+    if converter is None:
+        raise ValueError(f"Unknown odds format {fmt!r} (expected one of {', '.join(ODDS_FORMATS)})")
+    return converter
+
+
+def _american_floats(odds):
+    """Bulk float conversion of numeric American odds, or None to convert price by price."""
+    try:
+        values = list(map(float, odds))
+    except (TypeError, ValueError, OverflowError):
+        return None
+    # sum() is NaN/inf if any value is (or on overflow): let the per-price path decide
+    if values and (not isfinite(sum(values)) or min(map(abs, values)) < 100):
+        return None
+    return [10000 / (o + 100) if o > 0 else -100 * o / (100 - o) for o in values]
+
+
+def _decimal_floats(odds):
+    try:
+        values = list(map(float, odds))
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if values and (not isfinite(sum(values)) or min(values) <= 1):
+        return None
+    return list(map(truediv, repeat(100.0), values))
+
+
+# Float-mode fast paths for mostly distinct prices; they hand anything
+# unusual (Unicode minus, invalid prices) back to the per-price converter,
+# which also produces the error message.
+_BULK_CONVERTERS = {
+    'american': _american_floats,
+    'decimal': _decimal_floats,
+}
+
+
+def _as_sequence(odds):
+    return odds if isinstance(odds, (list, tuple, array)) else list(odds)
+
+
+def _convert(odds, fmt, exact):
+    """Iterable of converted prices; distinct prices are converted once when they repeat."""
+    converter = _converter(fmt, exact)
+    sample = odds[::len(odds) // TABLE_SAMPLE_SIZE + 1]
+    if len(set(sample)) * 2 <= len(sample):
+        table = {price: converter(price) for price in set(odds)}
+        return map(table.__getitem__, odds)
+    bulk = None if exact else _BULK_CONVERTERS.get(fmt)
+    converted = bulk(odds) if bulk is not None else None
+    return converted if converted is not None else map(converter, odds)
+
+
+def implied_probabilities(odds, fmt='american', exact=False):
+    """
+    Implied win probability (%) of each price, vig included.
+
+    american: +150 / -136 (ints, floats or strings); decimal: 2.5;
+    fractional: "3/2", (3, 2) or Fraction(3, 2). Raises ValueError on a
+    price that can't be one (|american| < 100, decimal <= 1, negative
+    fraction, NaN or infinite) and on an unknown `fmt`.
+    """
+    probabilities = _convert(_as_sequence(odds), fmt, exact)
+    return list(probabilities) if exact else array('d', probabilities)
+
+
+def _paired(over_odds, under_odds, fmt, exact):
+    """Implied probabilities of both sides, as lists."""
+    over_odds, under_odds = _as_sequence(over_odds), _as_sequence(under_odds)
+    if len(over_odds) != len(under_odds):
+        raise ValueError(f"Got {len(over_odds)} over prices but {len(under_odds)} under prices")
+    return list(_convert(over_odds, fmt, exact)), list(_convert(under_odds, fmt, exact))
+
+
+def _no_vig_exact(over, under):
+    # a/b over (a/b + c/d) == ad / (ad + cb): one reduction instead of three
+    ad = over.numerator * under.denominator
+    cb = under.numerator * over.denominator
+    return Fraction(100 * ad, ad + cb), Fraction(100 * cb, ad + cb)
+
+
+def no_vig_probabilities(over_odds, under_odds, fmt='american', exact=False):
+    """
+    No-vig (%) for each over/under pair: each side's implied probability
+    divided by the pair's total. Returns (over, under), parallel to the input.
+    """
+    over, under = _paired(over_odds, under_odds, fmt, exact)
+    if exact:
+        pairs = list(map(_no_vig_exact, over, under))
+        return [pair[0] for pair in pairs], [pair[1] for pair in pairs]
+    # side / (total / 100) keeps every step inside map()
+    scale = list(map(truediv, map(add, over, under), repeat(100)))
+    return array('d', map(truediv, over, scale)), array('d', map(truediv, under, scale))
+
+
+def overrounds(over_odds, under_odds, fmt='american', exact=False):
+    """Over + under implied probability (%) of each pair; 100 means no vig."""
+    over, under = _paired(over_odds, under_odds, fmt, exact)
+    totals = map(add, over, under)
+    return list(totals) if exact else array('d', totals)
@@ -0,0 +1,187 @@
+# opportunity_index.py
+
+import base64
+import hashlib
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+
+# sort key -> (opportunity field, descending)
+SORT_KEYS = {
+    'edge': ('edge', True),
+    'win_pct': ('no_vig_win_pct', True),
+    'payout': ('payout', True),
+    'line': ('line', False),
+    'player': ('player', False),
+    'id': ('id', False),
+}
+DEFAULT_SORT = 'edge'
+
+# Filters answered from posting lists (exact, case-insensitive match)
+FILTER_FIELDS = ('sport', 'stat', 'bet_type', 'direction')
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+_EMPTY = array('i')
+
+
+class QueryError(ValueError):
+    """Bad query parameters (mapped to HTTP 400)."""
+
+
+class StaleCursor(QueryError):
+    """Cursor issued for an older snapshot (mapped to HTTP 410)."""
+
+
+def _terms(opp):
+    terms = {
+        ('sport', (opp.get('sport') or 'Other').lower()),
+        ('stat', opp['stat'].lower()),
+        ('direction', opp['direction'].lower()),
+    }
+    for bet in opp.get('all_qualifying_bets', ()):
+        terms.add(('bet_type', bet['type'].lower()))
+    return frozenset(terms)
+
+
+def _encode_cursor(payload):
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        return payload['v'], payload['s'], payload['f'], int(payload['r'])
+    except (ValueError, KeyError, TypeError):
+        raise QueryError("Malformed cursor")
+
+
+class OpportunityIndex:
+    """
+    Sorted indexes over one snapshot of dashboard opportunities.
+
+    Built once per snapshot: for every sort key the opportunities are ranked
+    once, and each filter value (sport, stat, bet type, direction) gets a
+    posting list of ranks in that order. A query walks the shortest posting
+    list from the cursor's rank and checks the remaining filters, so a page
+    costs roughly `limit` steps regardless of slate size. With sort=edge,
+    min_edge is a rank cutoff found by binary search.
+
+    Cursors encode the snapshot version, sort key, filters and the rank to
+    resume from; a cursor from another snapshot raises StaleCursor.
+    """
+
+    def __init__(self, opportunities, version):
+        self.opportunities = opportunities
+        self.version = version
+        # Slates repeat the same few sport/stat/direction/bet-type combinations,
+        # so term sets are built once per combination and shared
+        self._terms = []
+        positions_by_combo = {}
+        for pos, opp in enumerate(opportunities):
+            combo = (opp.get('sport'), opp['stat'], opp['direction'],
+                     tuple(bet['type'] for bet in opp.get('all_qualifying_bets', ())))
+            positions = positions_by_combo.get(combo)
+            if positions is None:
+                positions = positions_by_combo[combo] = (_terms(opp), [])
+            self._terms.append(positions[0])
+            positions[1].append(pos)
+        self._term_positions = {}  # (field, value) -> positions, ascending
+        for terms, positions in positions_by_combo.values():
+            for term in terms:
+                self._term_positions.setdefault(term, []).extend(positions)
+        for positions in self._term_positions.values():
+            positions.sort()
+        self._orders = {}     # sort key -> positions in sort order
+        self._rank_of = {}    # sort key -> rank of each position
+        self._postings = {}   # sort key -> {(field, value): ranks, ascending}
+        self._build(DEFAULT_SORT)
+        self._neg_edges = array('d', (-opportunities[pos]['edge'] for pos in self._orders['edge']))
+
+    def _build(self, sort):
+        """Rank the snapshot by one sort key (other keys are built on first use)."""
+        field, descending = SORT_KEYS[sort]
+        opportunities = self.opportunities
+        order = sorted(range(len(opportunities)), key=lambda i: opportunities[i][field], reverse=descending)
+        rank_of = sorted(range(len(order)), key=order.__getitem__)
+        self._orders[sort] = array('i', order)
+        self._rank_of[sort] = array('i', rank_of)
+        self._postings[sort] = {
+            term: array('i', sorted(map(rank_of.__getitem__, positions)))
+            for term, positions in self._term_positions.items()
+        }
+
+    def __len__(self):
+        return len(self.opportunities)
+
+    def query(self, sport=None, stat=None, bet_type=None, direction=None, min_edge=None,
+              sort=None, limit=None, cursor=None):
+        """
+        Return {'opportunities': page, 'count': len(page), 'next_cursor': str or None}.
+        """
+        sort = sort or DEFAULT_SORT
+        if sort not in SORT_KEYS:
+            raise QueryError(f"Unknown sort key {sort!r} (expected one of {', '.join(SORT_KEYS)})")
+        limit = DEFAULT_PAGE_SIZE if limit is None else limit
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise QueryError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+        values = {'sport': sport, 'stat': stat, 'bet_type': bet_type, 'direction': direction}
+        terms = [(field, values[field].lower()) for field in FILTER_FIELDS if values[field]]
+        signature = hashlib.sha1(repr((terms, min_edge)).encode('utf-8')).hexdigest()[:12]
+
+        start_rank = 0
+        if cursor:
+            version, cursor_sort, cursor_signature, start_rank = _decode_cursor(cursor)
+            if version != self.version:
+                raise StaleCursor("Cursor is from an older snapshot; start again from the first page")
+            if cursor_sort != sort or cursor_signature != signature:
+                raise QueryError("Cursor does not match this query's filters and sort")
+
+        if sort not in self._orders:
+            self._build(sort)
+        order = self._orders[sort]
+        end_rank = len(order)
+        check_edge = min_edge is not None
+        edge_cutoff = bisect_right(self._neg_edges, -min_edge) if check_edge else None
+        if check_edge and sort == 'edge':
+            end_rank = edge_cutoff
+            check_edge = False
+
+        if terms:
+            postings = self._postings[sort]
+            lists = [(postings.get(term, _EMPTY), term) for term in terms]
+            driver, driver_term = min(lists, key=lambda item: len(item[0]))
+            others = frozenset(term for term in terms if term != driver_term)
+        else:
+            driver, others = range(len(order)), frozenset()
+
+        # A selective min_edge under another sort: walking the driver would
+        # mostly skip, so rank the few opportunities above the cutoff instead
+        if check_edge and edge_cutoff * edge_cutoff <= 4 * limit * len(driver):
+            rank_of = self._rank_of[sort]
+            driver = sorted(map(rank_of.__getitem__, self._orders['edge'][:edge_cutoff]))
+            others = frozenset(terms)
+            check_edge = False
+
+        opportunities = self.opportunities
+        page = []
+        next_cursor = None
+        for i in range(bisect_left(driver, start_rank), len(driver)):
+            rank = driver[i]
+            if rank >= end_rank:
+                break
+            pos = order[rank]
+            if others and not others <= self._terms[pos]:
+                continue
+            if check_edge and opportunities[pos]['edge'] < min_edge:
+                continue
+            if len(page) == limit:
+                next_cursor = _encode_cursor({'v': self.version, 's': sort, 'f': signature, 'r': rank})
+                break
+            page.append(opportunities[pos])
+
+        return {'opportunities': page, 'count': len(page), 'next_cursor': next_cursor}
@@ -0,0 +1,113 @@
+# page_filter.py
+
+import os
+from urllib.parse import urlsplit
+
+# Set PROPSHOP_BLOCK_RESOURCES=0 to load pages in full (e.g. when debugging selectors)
+BLOCK_RESOURCES_ENV = "PROPSHOP_BLOCK_RESOURCES"
+
+# Resource types neither scraper reads: we only need the DOM's aria-labels on
+# FanDuel and one JSON response on PrizePicks. Stylesheets stay allowed since
+# Playwright's visibility checks depend on layout.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "texttrack", "eventsource", "manifest"}
+
+# Hosts that always count as first party (suffix match) plus third parties the
+# site can't work without -- notably the HUMAN/PerimeterX "Press & Hold"
+# challenge, which must load for the CAPTCHA handlers to do anything.
+CAPTCHA_HOSTS = ["px-cdn.net", "px-cloud.net", "perimeterx.net", "pxchk.net", "px-client.net", "humansecurity.com"]
+
+SITE_PROFILES = {
+    "fanduel": {
+        "first_party": ["fanduel.com", "fanduel.net", "fdbox.net"],
+        "allow_hosts": CAPTCHA_HOSTS,
+    },
+    "prizepicks": {
+        "first_party": ["prizepicks.com"],
+        "allow_hosts": CAPTCHA_HOSTS,
+    },
+}
+
+
+def _host_matches(host, suffixes):
+    return any(host == suffix or host.endswith("." + suffix) for suffix in suffixes)
+
+
+class ResourceFilter:
+    """
+    Request router for a scraper's browser context.
+
+    Aborts requests for non-essential resource types and for hosts outside
+    the site's first-party/allow lists, and counts requests and bytes for
+    what was allowed vs blocked. Blocked requests are never downloaded, so
+    bytes are only counted for allowed responses (from Content-Length).
+    """
+
+    def __init__(self, site, blocked_types=None, extra_allow_hosts=()):
+        profile = SITE_PROFILES[site]
+        self.site = site
+        self.enabled = os.environ.get(BLOCK_RESOURCES_ENV, "1") != "0"
+        self.blocked_types = set(BLOCKED_RESOURCE_TYPES if blocked_types is None else blocked_types)
+        self.allowed_hosts = list(profile["first_party"]) + list(profile["allow_hosts"]) + list(extra_allow_hosts)
+        self.requests_allowed = 0
+        self.requests_blocked = 0
+        self.bytes_allowed = 0
+        self.blocked_by_reason = {}
+
+    def decide(self, url, resource_type):
+        """Return None to let the request through, or the reason it's blocked."""
+        if not self.enabled:
+            return None
+        scheme = url.split(":", 1)[0]
+        if scheme in ("data", "blob", "about"):
+            return None
+        if resource_type in self.blocked_types:
+            return resource_type
+        host = (urlsplit(url).hostname or "").lower()
+        if host and not _host_matches(host, self.allowed_hosts):
+            return "third-party"
+        return None
+
+    async def handle_route(self, route):
+        request = route.request
+        reason = self.decide(request.url, request.resource_type)
+        if reason is None:
+            self.requests_allowed += 1
+            await route.continue_()
+        else:
+            self.requests_blocked += 1
+            self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+            await route.abort("blockedbyclient")
+
+    def handle_response(self, response):
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.bytes_allowed += int(length)
+
+    async def install(self, context):
+        """Route every page (and iframe) of a browser context through this filter."""
+        if not self.enabled:
+            return
+        await context.route("**/*", self.handle_route)
+        context.on("response", self.handle_response)
+
+    def stats(self):
+        total = self.requests_allowed + self.requests_blocked
+        return {
+            'site': self.site,
+            'enabled': self.enabled,
+            'requests_allowed': self.requests_allowed,
+            'requests_blocked': self.requests_blocked,
+            'blocked_pct': round(self.requests_blocked / total * 100, 1) if total else 0,
+            'blocked_by_reason': dict(self.blocked_by_reason),
+            'bytes_allowed': self.bytes_allowed,
+        }
+
+    def summary(self):
+        stats = self.stats()
+        if not stats['enabled']:
+            return f"{self.site}: resource blocking disabled"
+        return (
+            f"{self.site}: {stats['requests_allowed']} requests allowed "
+            f"({stats['bytes_allowed'] / 1e6:.1f} MB), {stats['requests_blocked']} blocked "
+            f"({stats['blocked_pct']}%) {stats['blocked_by_reason']}"
+        )
@@ -2,21 +2,108 @@
 
 import asyncio
 import random
-from playwright.async_api import async_playwright
 from pathlib import Path
+from projections_cache import ProjectionsCache
+from page_filter import ResourceFilter
 
 APP_URL = "https://app.prizepicks.com/"
 PROJECTIONS_URL_PART = "api.prizepicks.com/projections"
 
 # Store browser data to maintain sessions and reduce CAPTCHA triggers
 USER_DATA_DIR = Path.home() / ".propshop" / "browser_data"
-USER_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-async def fetch_props():
+# Shared across calls so back-to-back fetches (e.g. repeated /api/analyze) reuse
+# the payload. Created on first use so importing this module stays cheap.
+projections_cache = None
+
+def get_projections_cache():
+    global projections_cache
+    if projections_cache is None:
+        projections_cache = ProjectionsCache()
+    return projections_cache
+
+def parse_projections(projections_data):
+    """
+    Turn a raw projections payload into {player_name: [{'stat', 'line', 'player_id', 'event'}]}.
+    'event' is the projection's game ID (its start time when there is none).
+    """
+    players = {item['id']: item['attributes']['display_name'] for item in projections_data.get('included', []) if item['type'] == 'new_player'}
+    
+    props_by_player = {}
+    for projection in projections_data.get('data', []):
+        if projection['type'] == 'projection':
+            player_id = projection['relationships']['new_player']['data']['id']
+            player_name = players.get(player_id)
+            if player_name:
+                if player_name not in props_by_player:
+                    props_by_player[player_name] = []
+                
+                attributes = projection['attributes']
+                game = (projection['relationships'].get('game') or {}).get('data') or {}
+                props_by_player[player_name].append({
+                    'stat': attributes['stat_type'],
+                    'line': attributes['line_score'],
+                    'player_id': player_id,
+                    'event': attributes.get('game_id') or game.get('id') or attributes.get('start_time'),
+                })
+    
+    return props_by_player
+
+async def revalidate_cached_projections(context):
+    """
+    Re-requests the cached projections URL with If-None-Match/If-Modified-Since.
+    Returns props when the cache could be refreshed this way, or None to fall
+    back to a full page load (e.g. the API demands a CAPTCHA).
+    """
+    projections_cache = get_projections_cache()
+    print("Revalidating cached PrizePicks projections...")
+    try:
+        response = await context.request.get(
+            projections_cache.url,
+            headers=projections_cache.conditional_headers(),
+            timeout=10000,
+        )
+    except Exception as e:
+        print(f"Conditional refresh failed ({e}), falling back to page load.")
+        return None
+    
+    if response.status == 304:
+        print("PrizePicks projections not modified, reusing cached props.")
+        return projections_cache.record_not_modified()
+    
+    if not response.ok:
+        print(f"Conditional refresh returned HTTP {response.status}, falling back to page load.")
+        return None
+    
+    try:
+        props, changed = projections_cache.store(
+            await response.body(), response.headers, response.url, parse_projections
+        )
+    except ValueError as e:
+        print(f"Error decoding PrizePicks JSON: {e}")
+        return None
+    
+    print("Refreshed PrizePicks projections." if changed else "PrizePicks payload unchanged, reusing parsed props.")
+    return props
+
+async def fetch_props(force_refresh=False):
     """
     Launches a visible browser to reliably scrape props from PrizePicks.
     Returns a dictionary of props, structured by player name.
+    
+    Results are cached for PROJECTIONS_TTL seconds; after that the cached
+    projections call is revalidated before falling back to a full page load.
+    Pass force_refresh=True to skip the TTL check.
     """
+    projections_cache = get_projections_cache()
+    if not force_refresh and projections_cache.is_fresh():
+        print(f"Using cached PrizePicks props ({projections_cache.age():.0f}s old).")
+        return projections_cache.record_hit()
+    
+    # Playwright is heavy to import; only load it when we actually scrape
+    from playwright.async_api import async_playwright
+    
+    USER_DATA_DIR.mkdir(parents=True, exist_ok=True)
     print("Launching browser to fetch PrizePicks data (visible for reliability)...")
     async with async_playwright() as p:
         # Launch with better anti-detection
@@ -39,6 +126,17 @@ async def fetch_props():
             timezone_id='America/Los_Angeles',
         )
         
+        # Only the projections JSON matters; skip images, fonts, trackers etc.
+        resource_filter = ResourceFilter("prizepicks")
+        await resource_filter.install(context)
+        
+        if projections_cache.url and projections_cache.props is not None:
+            props = await revalidate_cached_projections(context)
+            if props is not None:
+                await browser.close()
+                print("PrizePicks browser closed.")
+                return props
+        
         page = await context.new_page()
         
         # Better anti-detection scripts
@@ -49,18 +147,19 @@ async def fetch_props():
             window.chrome = {runtime: {}};
         """)
 
-        projections_data = None
+        # (raw body, headers, url) of the intercepted projections call
+        projections_response = None
 
         async def handle_response(response):
-            nonlocal projections_data
+            nonlocal projections_response
             if PROJECTIONS_URL_PART in response.url and response.request.method == 'GET':
-                if projections_data is None:
+                if projections_response is None:
                     print("--- Intercepted PrizePicks API Call! ---")
                     try:
-                        projections_data = await response.json()
+                        projections_response = (await response.body(), response.headers, response.url)
                         print("Successfully captured PrizePicks data.")
                     except Exception as e:
-                        print(f"Error decoding PrizePicks JSON: {e}")
+                        print(f"Error reading PrizePicks response: {e}")
 
         page.on("response", handle_response)
 
@@ -171,7 +270,7 @@ async def fetch_props():
             # --- Dynamic Waiting for Data ---
             print("Waiting for data to be captured...")
             start_time = asyncio.get_event_loop().time()
-            while projections_data is None and (asyncio.get_event_loop().time() - start_time) <= 20:
+            while projections_response is None and (asyncio.get_event_loop().time() - start_time) <= 20:
                 await page.wait_for_timeout(100)
 
         except Exception as e:
@@ -179,25 +278,18 @@ async def fetch_props():
         
         await browser.close()
         print("PrizePicks browser closed.")
+        print(f"Resources: {resource_filter.summary()}")
 
-        if not projections_data:
+        if not projections_response:
             print("Could not retrieve data from PrizePicks.")
             return {}
 
-        players = {item['id']: item['attributes']['display_name'] for item in projections_data.get('included', []) if item['type'] == 'new_player'}
-        
-        props_by_player = {}
-        for projection in projections_data.get('data', []):
-            if projection['type'] == 'projection':
-                player_id = projection['relationships']['new_player']['data']['id']
-                player_name = players.get(player_id)
-                if player_name:
-                    if player_name not in props_by_player:
-                        props_by_player[player_name] = []
-                    
-                    props_by_player[player_name].append({
-                        'stat': projection['attributes']['stat_type'],
-                        'line': projection['attributes']['line_score']
-                    })
+        try:
+            props_by_player, changed = projections_cache.store(*projections_response, parse_projections)
+        except ValueError as e:
+            print(f"Error decoding PrizePicks JSON: {e}")
+            return {}
         
+        if not changed:
+            print("PrizePicks payload unchanged since last fetch, reusing parsed props.")
         return props_by_player
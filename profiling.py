@@ -0,0 +1,253 @@
+# profiling.py
+
+import functools
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+# Set PROPSHOP_PROFILE=1 (or a comma list of features, e.g. "cpu,requests")
+# to enable the hooks below for `main.py --api`. When unset, nothing is
+# wrapped, started or registered.
+PROFILE_ENV = "PROPSHOP_PROFILE"
+PROFILE_DIR_ENV = "PROPSHOP_PROFILE_DIR"
+PROFILE_FRAMES_ENV = "PROPSHOP_PROFILE_FRAMES"
+PROFILE_DIR = Path(__file__).parent / "data" / "profiles"
+
+# memory: tracemalloc diffs (tracing slows allocation-heavy code ~10x)
+# cpu: on-demand stack sampling (no cost until a profile is requested)
+# requests: per-request allocation log for /api/analyze
+PROFILE_FEATURES = ('memory', 'cpu', 'requests')
+
+# Frames kept per tracemalloc trace. Diffs are grouped by line, which needs
+# one; each extra frame makes every traced allocation slower.
+TRACEMALLOC_FRAMES = 1
+
+# Lines written per memory diff
+MEMORY_TOP_STATS = 50
+
+# CPU sampling defaults; windows are capped so a stray request can't pin a thread for long
+CPU_SAMPLE_SECONDS = 10
+CPU_SAMPLE_INTERVAL = 0.005  # seconds
+CPU_MAX_SECONDS = 300
+
+# Frames from the profiler itself are dropped from memory diffs
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<unknown>")
+
+
+def profile_features():
+    """Features switched on by PROPSHOP_PROFILE (empty set when profiling is off)."""
+    value = os.environ.get(PROFILE_ENV, "").strip().lower()
+    if value in ("", "0"):
+        return frozenset()
+    if value in ("1", "all"):
+        return frozenset(PROFILE_FEATURES)
+    features = frozenset(name.strip() for name in value.split(",") if name.strip())
+    unknown = features - set(PROFILE_FEATURES)
+    if unknown:
+        raise ValueError(f"Unknown {PROFILE_ENV} feature(s) {sorted(unknown)} (expected 1, all, or {', '.join(PROFILE_FEATURES)})")
+    return features
+
+
+def _stamp():
+    return datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+
+
+class Profiler:
+    """
+    Opt-in memory and CPU profiling for the long-running API server.
+
+    - memory_diff(): tracemalloc snapshot compared against the previous one
+      (the first call is the baseline), written to memory-<time>.txt.
+    - cpu_profile(seconds): samples every thread's stack from a background
+      thread and writes folded stacks (flamegraph.pl / speedscope input) to
+      cpu-<time>.folded.
+    - track_allocations(endpoint): logs net memory blocks per call (plus
+      traced bytes and peak when memory tracing is on) to
+      <name>-allocations.jsonl. Counters are process-wide, so requests that
+      overlap share each other's counts.
+
+    Both snapshots can also be triggered with SIGUSR1 (memory) and SIGUSR2
+    (CPU, CPU_SAMPLE_SECONDS window) where the platform has them.
+    """
+
+    def __init__(self, features=PROFILE_FEATURES, directory=None, frames=None):
+        self.features = frozenset(features)
+        self.directory = Path(directory or os.environ.get(PROFILE_DIR_ENV) or PROFILE_DIR)
+        self.frames = frames or int(os.environ.get(PROFILE_FRAMES_ENV) or TRACEMALLOC_FRAMES)
+        self._previous = None
+        self._lock = threading.Lock()
+        self._sampling = False
+
+    @classmethod
+    def from_env(cls):
+        """A started Profiler for the features in PROPSHOP_PROFILE, or None when it's off."""
+        features = profile_features()
+        return cls(features).start() if features else None
+
+    def start(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if 'memory' in self.features and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        print(f"🔬 Profiling {', '.join(sorted(self.features))}, writing to {self.directory}")
+        return self
+
+    def memory_diff(self, top=MEMORY_TOP_STATS):
+        """Take a tracemalloc snapshot and write its growth since the last one."""
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, pattern) for pattern in _IGNORED_FILES]
+        )
+        with self._lock:
+            previous, self._previous = self._previous, snapshot
+        if previous is None:
+            stats, title = snapshot.statistics('lineno'), "baseline (no previous snapshot)"
+        else:
+            stats, title = snapshot.compare_to(previous, 'lineno'), "growth since previous snapshot"
+
+        current, peak = tracemalloc.get_traced_memory()
+        path = self.directory / f"memory-{_stamp()}.txt"
+        with open(path, 'w') as f:
+            f.write(f"# {title}\n# traced: {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB\n")
+            for stat in stats[:top]:
+                f.write(f"{stat}\n")
+        return {
+            'file': str(path),
+            'baseline': previous is None,
+            'traced_bytes': current,
+            'peak_bytes': peak,
+            'top': [str(stat) for stat in stats[:10]],
+        }
+
+    def cpu_profile(self, seconds=CPU_SAMPLE_SECONDS, interval=CPU_SAMPLE_INTERVAL):
+        """
+        Sample all threads for `seconds` and write folded stacks.
+        Blocks the calling thread; returns None if a profile is already running.
+        """
+        seconds = min(max(seconds, 0.1), CPU_MAX_SECONDS)
+        with self._lock:
+            if self._sampling:
+                return None
+            self._sampling = True
+        try:
+            own_thread = threading.get_ident()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = Counter()
+            samples = 0
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append(f"{Path(code.co_filename).name}:{code.co_name}:{frame.f_lineno}")
+                        frame = frame.f_back
+                    stack.append(names.get(thread_id) or str(thread_id))
+                    stacks[';'.join(reversed(stack))] += 1
+                samples += 1
+                time.sleep(interval)
+        finally:
+            with self._lock:
+                self._sampling = False
+
+        path = self.directory / f"cpu-{_stamp()}.folded"
+        with open(path, 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        leaves = Counter()
+        for stack, count in stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return {
+            'file': str(path),
+            'seconds': seconds,
+            'samples': samples,
+            'top': [{'frame': frame, 'samples': count} for frame, count in leaves.most_common(10)],
+        }
+
+    def cpu_profile_in_background(self, seconds=CPU_SAMPLE_SECONDS):
+        threading.Thread(target=self.cpu_profile, args=(seconds,), name="propshop-cpu-profile", daemon=True).start()
+
+    def track_allocations(self, endpoint):
+        """Wrap an async endpoint so each call's memory use is logged."""
+        log_path = self.directory / f"{endpoint.__name__}-allocations.jsonl"
+
+        @functools.wraps(endpoint)
+        async def tracked(*args, **kwargs):
+            tracing = tracemalloc.is_tracing()
+            if tracing:
+                tracemalloc.reset_peak()
+                start_bytes, _ = tracemalloc.get_traced_memory()
+            start_blocks = sys.getallocatedblocks()
+            started = time.perf_counter()
+            status = 'ok'
+            try:
+                return await endpoint(*args, **kwargs)
+            except Exception as e:
+                status = type(e).__name__
+                raise
+            finally:
+                record = {
+                    'at': datetime.utcnow().isoformat() + 'Z',
+                    'endpoint': endpoint.__name__,
+                    'params': {k: v for k, v in kwargs.items() if v is not None},
+                    'status': status,
+                    'seconds': round(time.perf_counter() - started, 4),
+                    'net_blocks': sys.getallocatedblocks() - start_blocks,
+                }
+                if tracing:
+                    end_bytes, peak = tracemalloc.get_traced_memory()
+                    record['traced_bytes_delta'] = end_bytes - start_bytes
+                    record['traced_peak_bytes'] = peak - start_bytes
+                with open(log_path, 'a') as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+
+        return tracked
+
+    def install_signal_handlers(self):
+        """SIGUSR1 writes a memory diff, SIGUSR2 a CPU profile (both off the signal handler)."""
+        if not hasattr(signal, 'SIGUSR1') or threading.current_thread() is not threading.main_thread():
+            return []
+        installed = []
+        if 'memory' in self.features:
+            signal.signal(signal.SIGUSR1, lambda signum, frame: threading.Thread(
+                target=self.memory_diff, name="propshop-memory-diff", daemon=True).start())
+            installed.append("-USR1 for a memory diff")
+        if 'cpu' in self.features:
+            signal.signal(signal.SIGUSR2, lambda signum, frame: self.cpu_profile_in_background())
+            installed.append(f"-USR2 for a {CPU_SAMPLE_SECONDS}s CPU profile")
+        return installed
+
+    def wrap_endpoint(self, endpoint):
+        """track_allocations when per-request logging is on, else the endpoint itself."""
+        return self.track_allocations(endpoint) if 'requests' in self.features else endpoint
+
+    def install(self, app):
+        """Register the /api/debug endpoints and signal handlers on a FastAPI app."""
+        import asyncio
+
+        if 'memory' in self.features:
+            @app.post("/api/debug/memory")
+            async def memory_snapshot():
+                return await asyncio.to_thread(self.memory_diff)
+
+        if 'cpu' in self.features:
+            @app.post("/api/debug/cpu")
+            async def cpu_snapshot(seconds: float = CPU_SAMPLE_SECONDS):
+                from fastapi import HTTPException
+
+                result = await asyncio.to_thread(self.cpu_profile, seconds)
+                if result is None:
+                    raise HTTPException(status_code=409, detail="A CPU profile is already running")
+                return result
+
+        installed = self.install_signal_handlers()
+        if installed:
+            print(f"🔬 kill {' / '.join(installed)} (pid {os.getpid()})")
+        return app
@@ -0,0 +1,156 @@
+# projections_cache.py
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+CACHE_FILE = Path.home() / ".propshop" / "projections_cache.json"
+
+# How long a captured projections payload is served without touching PrizePicks
+PROJECTIONS_TTL = 5 * 60  # seconds
+
+
+class ProjectionsCache:
+    """
+    Last PrizePicks projections payload plus the props parsed from it.
+
+    Entries carry the response's ETag/Last-Modified (for conditional refresh)
+    and a SHA-256 of the raw body, so a refresh that returns the same payload
+    is recognised and neither re-parsed nor re-analyzed. Validators and the
+    fetch time also live in a small sidecar file, which is all a
+    revalidation rewrites.
+    """
+
+    def __init__(self, ttl=PROJECTIONS_TTL, path=CACHE_FILE):
+        self.ttl = ttl
+        self.path = Path(path)
+        self.meta_path = self.path.with_name(self.path.stem + '.meta.json')
+        self.url = None
+        self.etag = None
+        self.last_modified = None
+        self.payload_hash = None
+        self.props = None
+        self.fetched_at = None  # epoch seconds of the last successful fetch or revalidation
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.url = saved.get('url')
+        self.etag = saved.get('etag')
+        self.last_modified = saved.get('last_modified')
+        self.payload_hash = saved.get('payload_hash')
+        self.props = saved.get('props')
+        self.fetched_at = saved.get('fetched_at')
+        try:
+            with open(self.meta_path, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        if meta.get('payload_hash') == self.payload_hash:
+            self.etag = meta.get('etag')
+            self.last_modified = meta.get('last_modified')
+            self.fetched_at = meta.get('fetched_at')
+
+    def _save(self, raw_payload):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'url': self.url,
+                'etag': self.etag,
+                'last_modified': self.last_modified,
+                'payload_hash': self.payload_hash,
+                'fetched_at': self.fetched_at,
+                'props': self.props,
+                'payload': raw_payload.decode('utf-8', errors='replace'),
+            }, f)
+        os.replace(tmp_path, self.path)
+        self._save_meta()
+
+    def _save_meta(self):
+        """Write just the validators and fetch time (the payload file is left alone)."""
+        tmp_path = self.meta_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'payload_hash': self.payload_hash,
+                'etag': self.etag,
+                'last_modified': self.last_modified,
+                'fetched_at': self.fetched_at,
+            }, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def age(self):
+        """Seconds since the payload was last fetched or revalidated, or None."""
+        if self.fetched_at is None:
+            return None
+        return time.time() - self.fetched_at
+
+    def is_fresh(self):
+        age = self.age()
+        return self.props is not None and age is not None and age < self.ttl
+
+    def conditional_headers(self):
+        """Request headers for revalidating the cached payload."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def record_hit(self):
+        self.hits += 1
+        return self.props
+
+    def record_not_modified(self):
+        """
+        The server answered 304 (or an identical body): keep the parsed props.
+        The new fetch time (and any new validators) are saved to the sidecar,
+        so the entry is still fresh after a restart.
+        """
+        self.revalidations += 1
+        self.fetched_at = time.time()
+        self._save_meta()
+        return self.props
+
+    def store(self, raw_payload, headers, url, parse):
+        """
+        Cache a freshly downloaded payload. `parse` is only called when the
+        body differs from the cached one. Returns (props, changed).
+        """
+        payload_hash = hashlib.sha256(raw_payload).hexdigest()
+        self.url = url or self.url
+        self.etag = headers.get('etag') or self.etag
+        self.last_modified = headers.get('last-modified') or self.last_modified
+
+        if payload_hash == self.payload_hash and self.props is not None:
+            return self.record_not_modified(), False
+
+        self.misses += 1
+        self.props = parse(json.loads(raw_payload))
+        self.payload_hash = payload_hash
+        self.fetched_at = time.time()
+        self._save(raw_payload)
+        return self.props, True
+
+    def stats(self):
+        requests = self.hits + self.revalidations + self.misses
+        age = self.age()
+        return {
+            'age_seconds': round(age, 1) if age is not None else None,
+            'ttl_seconds': self.ttl,
+            'payload_hash': self.payload_hash,
+            'hits': self.hits,
+            'revalidations': self.revalidations,
+            'misses': self.misses,
+            'hit_rate': round((self.hits + self.revalidations) / requests * 100, 2) if requests else 0,
+        }
@@ -0,0 +1,145 @@
+# resilience.py
+
+import asyncio
+import random
+import time
+
+# Retries allowed per error class. Anything we can't classify is treated as
+# fatal so a genuinely broken page doesn't get hammered.
+RETRY_POLICY = {
+    "timeout": 2,
+    "network": 3,
+    "captcha": 1,
+    "fatal": 0,
+}
+
+BASE_BACKOFF = 2.0  # seconds
+MAX_BACKOFF = 30.0  # seconds
+
+
+class BudgetExhausted(Exception):
+    """Raised when the run's time budget has been used up."""
+
+
+class CircuitOpen(Exception):
+    """Raised when too many consecutive calls have failed."""
+
+
+class CaptchaError(Exception):
+    """Raised when a CAPTCHA was shown and could not be solved."""
+
+
+def classify_error(exc):
+    """
+    Map an exception to one of the RETRY_POLICY classes.
+    Playwright errors are matched by name/message so this module doesn't
+    need to import Playwright.
+    """
+    if isinstance(exc, CaptchaError):
+        return "captcha"
+    if isinstance(exc, asyncio.TimeoutError) or type(exc).__name__ == "TimeoutError":
+        return "timeout"
+    if isinstance(exc, (ConnectionError, OSError)):
+        return "network"
+    message = str(exc)
+    if "net::ERR_" in message or "NS_ERROR" in message or "Connection closed" in message:
+        return "network"
+    return "fatal"
+
+
+class RunBudget:
+    """
+    Wall-clock budget for a whole scraping run.
+    Individual calls ask the budget for a deadline so that no single call can
+    outlive the run.
+    """
+
+    def __init__(self, total_seconds):
+        self.total_seconds = total_seconds
+        self.started = time.monotonic()
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def remaining(self):
+        return max(0.0, self.total_seconds - self.elapsed())
+
+    @property
+    def exhausted(self):
+        return self.remaining() <= 0
+
+    def deadline(self, call_timeout):
+        """Seconds a call may take: its own timeout, capped by what's left."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise BudgetExhausted(f"Time budget of {self.total_seconds:.0f}s used up")
+        return min(call_timeout, remaining)
+
+    def timeout_ms(self, call_timeout):
+        """Same as deadline() but in milliseconds, for Playwright timeouts."""
+        return int(self.deadline(call_timeout) * 1000)
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures."""
+
+    def __init__(self, failure_threshold=5):
+        self.failure_threshold = failure_threshold
+        self.consecutive_failures = 0
+        self.total_failures = 0
+
+    @property
+    def is_open(self):
+        return self.consecutive_failures >= self.failure_threshold
+
+    def record_success(self):
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self.total_failures += 1
+
+
+async def call_with_retry(func, budget, breaker=None, label="call",
+                          policy=RETRY_POLICY, base_delay=BASE_BACKOFF, max_delay=MAX_BACKOFF):
+    """
+    Await `func()` under the run budget, retrying with exponential backoff
+    according to the error class. A call that still fails after its retries
+    counts as one failure towards the circuit breaker.
+    """
+    attempt = 0
+    while True:
+        if breaker is not None and breaker.is_open:
+            raise CircuitOpen(f"{breaker.consecutive_failures} consecutive failures")
+
+        try:
+            # Budget first: func() must not create a coroutine that is never awaited
+            timeout = budget.deadline(budget.total_seconds)
+            result = await asyncio.wait_for(func(), timeout=timeout)
+        except (BudgetExhausted, CircuitOpen):
+            raise
+        except Exception as e:
+            kind = classify_error(e)
+            if budget.exhausted:
+                if breaker is not None:
+                    breaker.record_failure()
+                raise BudgetExhausted(f"Time budget used up during {label}") from e
+
+            if attempt >= policy.get(kind, 0):
+                if breaker is not None:
+                    breaker.record_failure()
+                raise
+
+            delay = min(max_delay, base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+            if delay >= budget.remaining():
+                if breaker is not None:
+                    breaker.record_failure()
+                raise
+
+            attempt += 1
+            print(f"  🔁 {label}: {kind} error ({e.__class__.__name__}), retry {attempt}/{policy[kind]} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
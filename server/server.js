@@ -7,26 +7,150 @@ const { spawn } = require('child_process');
 const app = express();
 const PORT = 3001;
 const DATA_FILE = path.join(__dirname, '..', 'data', 'opportunities.json');
+const VERSION_FILE = `${DATA_FILE}.version`; // Written last by daily_scraper's publish_snapshot()
 const PYTHON_VENV = path.join(__dirname, '..', 'venv', 'bin', 'python');
 const SCRAPER_SCRIPT = path.join(__dirname, '..', 'daily_scraper.py');
 
+const RELOAD_DEBOUNCE_MS = 50;
+const VERSION_POLL_MS = 30 * 1000; // Backstop in case fs.watch misses an event
+const VIEW_CACHE_LIMIT = 200;      // Filtered views kept per snapshot
+
 app.use(cors());
 app.use(express.json());
 
 let isScrapingInProgress = false; // Prevent multiple simultaneous scrapes
 
-// Helper function to read data from JSON file
-function readDataFile() {
+// Parsed snapshot held in memory; replaced only when a new version is published
+let snapshot = null;
+let reloadChain = Promise.resolve();
+let reloadTimer = null;
+
+function pushTo(map, key, value) {
+  const list = map.get(key);
+  if (list) list.push(value);
+  else map.set(key, [value]);
+}
+
+// Parse-once indexes for a snapshot: opportunities sorted by edge (best first),
+// and per-sport / per-bet-type lists that keep that order
+function buildSnapshot(version, data) {
+  const opportunities = data.opportunities || [];
+  const byEdge = [...opportunities].sort((a, b) => b.edge - a.edge);
+  const bySport = new Map();
+  const byBetType = new Map();
+  for (const opp of byEdge) {
+    pushTo(bySport, sportKey(opp), opp);
+    for (const bet of opp.all_qualifying_bets || []) {
+      pushTo(byBetType, bet.type.toLowerCase(), opp);
+    }
+  }
+  return {
+    version,
+    data,
+    byEdge,
+    bySport,
+    byBetType,
+    byId: new Map(opportunities.map(opp => [opp.id, opp])),
+    statsJson: JSON.stringify(data.stats),
+    views: new Map(),
+  };
+}
+
+// Load the published snapshot if its version differs from the one in memory
+async function loadSnapshot() {
+  let version;
+  try {
+    version = (await fs.promises.readFile(VERSION_FILE, 'utf8')).trim();
+  } catch (error) {
+    // No version file (written by an older scraper): fall back to the file's mtime
+    try {
+      version = `mtime-${(await fs.promises.stat(DATA_FILE)).mtimeMs}`;
+    } catch (statError) {
+      return snapshot;
+    }
+  }
+  if (snapshot && snapshot.version === version) return snapshot;
+
   try {
-    if (!fs.existsSync(DATA_FILE)) {
-      return null;
+    const data = JSON.parse(await fs.promises.readFile(DATA_FILE, 'utf8'));
+    const loadedVersion = data.version || version;
+    if (!snapshot || snapshot.version !== loadedVersion) {
+      snapshot = buildSnapshot(loadedVersion, data);
+      console.log(`📦 Loaded snapshot ${loadedVersion} (${snapshot.byEdge.length} opportunities)`);
     }
-    const data = fs.readFileSync(DATA_FILE, 'utf8');
-    return JSON.parse(data);
   } catch (error) {
+    // Keep serving the previous snapshot
     console.error('❌ Error reading data file:', error.message);
-    return null;
   }
+  return snapshot;
+}
+
+function scheduleReload() {
+  clearTimeout(reloadTimer);
+  reloadTimer = setTimeout(() => {
+    reloadChain = reloadChain.then(loadSnapshot);
+  }, RELOAD_DEBOUNCE_MS);
+}
+
+function watchSnapshot() {
+  const dataDir = path.dirname(DATA_FILE);
+  const watched = new Set([path.basename(DATA_FILE), path.basename(VERSION_FILE)]);
+  fs.mkdirSync(dataDir, { recursive: true });
+  fs.watch(dataDir, (eventType, filename) => {
+    if (!filename || watched.has(filename)) scheduleReload();
+  });
+  setInterval(scheduleReload, VERSION_POLL_MS).unref();
+}
+
+// Number of leading entries with edge >= minEdge in a list sorted by edge, descending
+function edgeCutoff(list, minEdge) {
+  let lo = 0;
+  let hi = list.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (list[mid].edge >= minEdge) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+function sportKey(opp) {
+  return (opp.sport || 'Other').toLowerCase();
+}
+
+function hasBetType(opp, betType) {
+  return (opp.all_qualifying_bets || []).some(bet => bet.type.toLowerCase() === betType);
+}
+
+// Opportunities matching the filters, serialized once per snapshot and filter combination
+function getView(snap, sport, betType, minEdge) {
+  const key = `${sport}|${betType}|${minEdge}`;
+  let view = snap.views.get(key);
+  if (view) return view;
+
+  let list;
+  if (!sport && !betType && minEdge === null) {
+    list = snap.data.opportunities || []; // Unfiltered: original order
+  } else {
+    const sportList = sport ? snap.bySport.get(sport) || [] : null;
+    const betTypeList = betType ? snap.byBetType.get(betType) || [] : null;
+    // With both filters, walk the shorter list and check the other condition
+    const bySportFirst = sportList && (!betTypeList || sportList.length <= betTypeList.length);
+    list = bySportFirst ? sportList : betTypeList || snap.byEdge;
+    if (minEdge !== null) list = list.slice(0, edgeCutoff(list, minEdge));
+    if (sportList && betTypeList) {
+      list = bySportFirst
+        ? list.filter(opp => hasBetType(opp, betType))
+        : list.filter(opp => sportKey(opp) === sport);
+    }
+  }
+
+  view = { key, count: list.length, json: JSON.stringify(list), bodies: {} };
+  if (snap.views.size >= VIEW_CACHE_LIMIT) {
+    snap.views.delete(snap.views.keys().next().value);
+  }
+  snap.views.set(key, view);
+  return view;
 }
 
 // Helper function to check if data is stale (> 24 hours old)
@@ -139,10 +263,9 @@ const fakeopportunities = [
 // API Routes
 app.get('/api/opportunities', (req, res) => {
   try {
-    // Read from JSON file
-    const data = readDataFile();
+    const snap = snapshot;
     
-    if (!data) {
+    if (!snap) {
       // No data file exists yet
       return res.json({
         success: true,
@@ -160,15 +283,32 @@ app.get('/api/opportunities', (req, res) => {
       });
     }
     
-    res.json({
-      success: true,
-      count: data.opportunities.length,
-      opportunities: data.opportunities,
-      stats: data.stats,
-      last_updated: data.last_updated,
-      date: data.date,
-      is_stale: isDataStale(data)
-    });
+    // Optional filters: ?sport=NBA&min_edge=1.5&bet_type=6-Pick Flex (filtered results are sorted by edge)
+    const sport = req.query.sport ? String(req.query.sport).toLowerCase() : '';
+    const betType = req.query.bet_type ? String(req.query.bet_type).toLowerCase() : '';
+    let minEdge = null;
+    if (req.query.min_edge !== undefined && req.query.min_edge !== '') {
+      minEdge = Number(req.query.min_edge);
+      if (!Number.isFinite(minEdge)) {
+        return res.status(400).json({ success: false, error: 'min_edge must be a number' });
+      }
+    }
+    
+    // Response bodies are built once per snapshot, filter set and staleness;
+    // the ETag comes from the same key so Express doesn't hash the body per request
+    const data = snap.data;
+    const view = getView(snap, sport, betType, minEdge);
+    const isStale = isDataStale(data);
+    if (!view.bodies[isStale]) {
+      view.bodies[isStale] = Buffer.from(
+        `{"success":true,"count":${view.count},"opportunities":${view.json},` +
+        `"stats":${snap.statsJson},"last_updated":${JSON.stringify(data.last_updated)},` +
+        `"date":${JSON.stringify(data.date)},"is_stale":${isStale},` +
+        `"version":${JSON.stringify(snap.version)}}`
+      );
+    }
+    res.set('ETag', `W/"${snap.version}:${view.key}:${isStale}"`);
+    res.type('application/json').send(view.bodies[isStale]);
   } catch (error) {
     console.error('❌ Error serving opportunities:', error.message);
     res.status(500).json({
@@ -179,10 +319,9 @@ app.get('/api/opportunities', (req, res) => {
 });
 
 app.get('/api/opportunities/:id', (req, res) => {
-  // Check cache or fake data for specific opportunity
-  const data = readDataFile();
-  const opportunities = data ? data.opportunities : fakeopportunities;
-  const opp = opportunities.find(o => o.id === parseInt(req.params.id));
+  // Check snapshot or fake data for specific opportunity
+  const id = parseInt(req.params.id);
+  const opp = snapshot ? snapshot.byId.get(id) : fakeopportunities.find(o => o.id === id);
   if (opp) {
     res.json({ success: true, opportunity: opp });
   } else {
@@ -192,7 +331,7 @@ app.get('/api/opportunities/:id', (req, res) => {
 
 app.get('/api/stats', (req, res) => {
   try {
-    const data = readDataFile();
+    const data = snapshot && snapshot.data;
     
     if (!data) {
       return res.json({
@@ -252,20 +391,13 @@ app.post('/api/trigger-scrape', (req, res) => {
   scraper.on('close', (code) => {
     isScrapingInProgress = false;
     
+    // The 202 below already answered the request; the watcher picks up the new snapshot
     if (code === 0) {
       console.log('✅ Scraping completed successfully');
-      res.json({
-        success: true,
-        message: 'Data refreshed successfully',
-        data: readDataFile()
-      });
+      scheduleReload();
     } else {
       console.error(`❌ Scraping failed with exit code ${code}`);
-      res.status(500).json({
-        success: false,
-        message: 'Scraping failed. Check server logs for details.',
-        error: errorOutput
-      });
+      console.error(errorOutput);
     }
   });
 
@@ -277,10 +409,13 @@ app.post('/api/trigger-scrape', (req, res) => {
   });
 });
 
-app.listen(PORT, () => {
-  console.log(`🚀 PropShop API Server running on http://localhost:${PORT}`);
-  console.log(`📊 Dashboard: http://localhost:3000`);
-  console.log(`📁 Data file: ${DATA_FILE}`);
-  console.log(`\n💡 Daily scraper runs at midnight via cron`);
-  console.log(`💡 Manual trigger: POST http://localhost:${PORT}/api/trigger-scrape\n`);
+loadSnapshot().then(() => {
+  watchSnapshot();
+  app.listen(PORT, () => {
+    console.log(`🚀 PropShop API Server running on http://localhost:${PORT}`);
+    console.log(`📊 Dashboard: http://localhost:3000`);
+    console.log(`📁 Data file: ${DATA_FILE} (version ${snapshot ? snapshot.version : 'none'})`);
+    console.log(`\n💡 Daily scraper runs at midnight via cron`);
+    console.log(`💡 Manual trigger: POST http://localhost:${PORT}/api/trigger-scrape\n`);
+  });
 });
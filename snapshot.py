@@ -0,0 +1,55 @@
+# snapshot.py
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+DATA_FILE = Path(__file__).parent / "data" / "opportunities.json"
+
+# One file per slate date (the day's last publish wins), replayed by backtest.py
+SNAPSHOT_DIR = Path(__file__).parent / "data" / "snapshots"
+
+
+def version_file(path):
+    """Sidecar holding the snapshot's version, watched by server/server.js."""
+    path = Path(path)
+    return path.with_name(path.name + ".version")
+
+
+def _atomic_write(path, content):
+    """Write to a temp file in the same directory, fsync, then rename over `path`."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def publish_snapshot(data, path=DATA_FILE, archive_dir=SNAPSHOT_DIR):
+    """
+    Atomically publish a dashboard snapshot.
+
+    The JSON is stamped with a 'version' (publish time in ms plus a content
+    hash), written to a temp file and renamed into place, so readers never
+    see a half-written file. The version sidecar is replaced last; the Node
+    server reloads only when it changes. A copy is kept in `archive_dir`
+    as <date>.json for backtesting (pass None to skip). Returns the version.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    body = json.dumps(data, indent=2, sort_keys=True)
+    version = f"{int(time.time() * 1000)}-{hashlib.sha256(body.encode('utf-8')).hexdigest()[:12]}"
+    data = dict(data, version=version)
+
+    body = json.dumps(data, indent=2)
+    if archive_dir is not None and data.get('date'):
+        archive_dir = Path(archive_dir)
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        _atomic_write(archive_dir / f"{data['date']}.json", body)
+    _atomic_write(path, body)
+    _atomic_write(version_file(path), version + "\n")
+    return version
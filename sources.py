@@ -0,0 +1,206 @@
+# sources.py
+
+import abc
+import asyncio
+import time
+from typing import TypedDict, Union
+
+# DFS sources post the lines we can play; sportsbook sources price them
+SOURCE_KINDS = ('dfs', 'sportsbook')
+
+# name -> adapter class, in registration order
+SOURCES = {}
+
+
+class Prop(TypedDict, total=False):
+    """One player prop as sources return it (sportsbook props also carry odds)."""
+    player: str
+    player_id: str
+    stat: str
+    line: Union[float, str]
+    event: str
+    over_odds: Union[int, str]
+    under_odds: Union[int, str]
+    captured_at: str  # ISO timestamp; the latest capture of a market wins in dedup.py
+
+
+def register_source(name, kind):
+    """Class decorator adding a source adapter to the registry."""
+    if kind not in SOURCE_KINDS:
+        raise ValueError(f"Unknown source kind {kind!r} (expected one of {', '.join(SOURCE_KINDS)})")
+
+    def decorator(cls):
+        cls.name, cls.kind = name, kind
+        SOURCES[name] = cls
+        return cls
+    return decorator
+
+
+def build_sources(kind, options=None, names=None):
+    """
+    Instantiate the registered sources of one kind.
+    `options` maps source name -> keyword arguments for its adapter.
+    """
+    options = options or {}
+    return [
+        cls(**options.get(name, {}))
+        for name, cls in SOURCES.items()
+        if cls.kind == kind and (names is None or name in names)
+    ]
+
+
+class Source(abc.ABC):
+    """
+    Common interface of every source adapter.
+
+    fetch(players, on_props) returns {player_name: [Prop]} and calls
+    on_props(player_name, props) for each player as soon as that player's
+    props are ready. DFS sources ignore `players`; sportsbook sources price
+    the (player_name, dfs_props) pairs read from the async iterable `players`
+    and may start before the DFS slate is complete.
+    """
+    name = None
+    kind = None
+
+    @abc.abstractmethod
+    async def fetch(self, players=None, on_props=None):
+        """Fetch props; see the class docstring."""
+
+
+@register_source('prizepicks', 'dfs')
+class PrizePicksSource(Source):
+    def __init__(self, force_refresh=False):
+        self.force_refresh = force_refresh
+
+    async def fetch(self, players=None, on_props=None):
+        from prizepicks_scraper import fetch_props
+        props_by_player = await fetch_props(force_refresh=self.force_refresh) or {}
+        if on_props is not None:
+            for player_name, props in props_by_player.items():
+                on_props(player_name, props)
+        return props_by_player
+
+
+@register_source('fanduel', 'sportsbook')
+class FanDuelSource(Source):
+    """Takes the same keyword arguments as fanduel_scraper.fetch_odds."""
+
+    def __init__(self, on_player_done=None, **options):
+        self.on_player_done = on_player_done
+        self.options = options
+
+    async def fetch(self, players=None, on_props=None):
+        from fanduel_scraper import fetch_odds_stream
+
+        def player_done(player_name, props, elapsed_seconds):
+            if self.on_player_done is not None:
+                self.on_player_done(player_name, props, elapsed_seconds)
+            if on_props is not None and props:
+                on_props(player_name, props)
+
+        return await fetch_odds_stream(players, on_player_done=player_done, **self.options)
+
+
+async def _drain(queue):
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+        yield item
+
+
+async def _run_source(source, report, players=None, on_props=None):
+    """Run one source, recording its outcome; a failing source returns {}."""
+    entry = report['sources'][source.name] = {'kind': source.kind, 'status': 'running', 'players': 0}
+    started = time.monotonic()
+    result = {}
+    try:
+        result = await source.fetch(players, on_props) or {}
+        entry['status'] = 'ok' if result else 'empty'
+    except asyncio.CancelledError:
+        entry['status'] = 'cancelled'
+        raise
+    except Exception as e:
+        entry.update(status='failed', error=f"{type(e).__name__}: {e}")
+        print(f"⚠️  Source {source.name} failed: {e}")
+    finally:
+        entry['players'] = len(result)
+        entry['elapsed_seconds'] = round(time.monotonic() - started, 3)
+    return result
+
+
+def merge_book_props(results):
+    """Concatenate sportsbook results per player; dedup.dedupe_props resolves overlaps."""
+    merged = {}
+    for result in results:
+        for player_name, props in result.items():
+            merged.setdefault(player_name, []).extend(props)
+    return merged
+
+
+async def gather_props(dfs_sources, book_sources, report=None, keep_pricing=None):
+    """
+    Fetch every DFS and sportsbook source and return (dfs_props, book_props).
+
+    DFS sources run concurrently. Sportsbook sources start at the same time
+    (so browsers warm up while the slate loads) and receive each player
+    through a queue as soon as a DFS source has parsed its props. A player
+    listed by several DFS sources is queued once with the props merged; lines
+    that arrive after a sportsbook has already searched that player are not
+    priced by it. A source that raises is recorded in report['sources'] and
+    the rest carry on with whatever it produced.
+
+    `keep_pricing(dfs_props)`, when given, is called once every DFS source
+    has finished; returning False cancels the sportsbook fetches (e.g. the
+    slate is unchanged and a recent result can be reused) and book_props
+    comes back empty.
+    """
+    report = {} if report is None else report
+    report['sources'] = {}
+    started = time.monotonic()
+
+    dfs_props = {}
+    queues = [asyncio.Queue() for _ in book_sources]
+
+    def on_dfs_props(player_name, props):
+        player_props = dfs_props.get(player_name)
+        if player_props is None:
+            player_props = dfs_props[player_name] = list(props)
+            for queue in queues:
+                queue.put_nowait((player_name, player_props))
+        else:
+            player_props.extend(props)
+
+    book_tasks = [
+        asyncio.create_task(_run_source(source, report, _drain(queue)))
+        for source, queue in zip(book_sources, queues)
+    ]
+    try:
+        await asyncio.gather(*(_run_source(source, report, on_props=on_dfs_props) for source in dfs_sources))
+        for queue in queues:
+            queue.put_nowait(None)
+        report['dfs_seconds'] = round(time.monotonic() - started, 3)
+
+        if keep_pricing is not None and not keep_pricing(dfs_props):
+            for task in book_tasks:
+                task.cancel()
+            await asyncio.gather(*book_tasks, return_exceptions=True)
+            book_results = []
+        else:
+            book_results = await asyncio.gather(*book_tasks)
+    finally:
+        for task in book_tasks:
+            task.cancel()
+
+    report['elapsed_seconds'] = round(time.monotonic() - started, 3)
+    return dfs_props, merge_book_props(book_results)
+
+
+def print_source_report(report):
+    for name, entry in report.get('sources', {}).items():
+        line = f"   - {name} ({entry['kind']}): {entry['status']}, {entry['players']} players in {entry['elapsed_seconds']:.1f}s"
+        if entry.get('error'):
+            line += f" ({entry['error']})"
+        print(line)
+    if 'elapsed_seconds' in report:
+        print(f"   - All sources finished in {report['elapsed_seconds']:.1f}s")
@@ -1,6 +1,15 @@
 # test_odds.py - Test the +EV logic with C.J. Stroud example
 
-from main import american_to_probability, calculate_no_vig_probability, BET_TYPES
+import random
+from fractions import Fraction
+
+from allocation import allocate, build_candidate_entries
+from analysis import (
+    american_to_probability, calculate_no_vig_probability, BET_TYPES,
+    find_plus_ev_opportunities, format_opportunities_for_dashboard,
+)
+from dedup import market_key
+from odds_math import implied_probabilities, no_vig_probabilities, overrounds
 
 # C.J. Stroud 239.5 passing yards
 player = "C.J. Stroud"
@@ -29,6 +38,10 @@ print(f"No-Vig Over: {no_vig_over:.2f}%")
 print(f"No-Vig Under: {no_vig_under:.2f}%")
 print(f"Total (should be 100%): {no_vig_over + no_vig_under:.2f}%")
 
+# Same numbers without rounding, for auditing
+exact_over, exact_under = no_vig_probabilities([over_odds], [under_odds], exact=True)
+print(f"Exact: Over {exact_over[0]} | Under {exact_under[0]} | Total {exact_over[0] + exact_under[0]}")
+
 # Step 3: Check against PrizePicks thresholds
 print("\n--- Step 3: Check Against PrizePicks Bet Type Thresholds ---")
 
@@ -83,3 +96,158 @@ else:
     print(f"   Need to find props with higher win probability")
     print(f"   Minimum threshold: 54.21% (6-Pick Flex)")
     print(f"   This prop: Over {no_vig_over:.2f}% | Under {no_vig_under:.2f}%")
+
+
+# Property check: the batch float mode agrees with exact Fraction mode, with
+# the scalar helpers above, and across equivalent American/decimal/fractional
+# prices. Randomized but seeded, so a failure reproduces.
+print("\n" + "="*80)
+print("🧪 ODDS MATH PROPERTY CHECK")
+print("="*80)
+
+rng = random.Random(41)
+CASES = 2000
+REL_TOL = 1e-12
+
+
+def random_american():
+    magnitude = rng.choice([rng.randint(100, 1000), rng.randint(100, 100000), rng.uniform(100, 5000)])
+    return rng.choice([-1, 1]) * magnitude
+
+
+def close(a, b):
+    return abs(a - b) <= REL_TOL * max(abs(a), abs(b))
+
+
+overs = [random_american() for _ in range(CASES)]
+unders = [random_american() for _ in range(CASES)]
+# A few as scraped strings, including FanDuel's Unicode minus
+overs[:3] = ["+150", "\u2212136", " -110 "]
+
+for fmt_odds, fmt in (
+    (overs, 'american'),
+    ([rng.uniform(1.001, 50) for _ in range(CASES)], 'decimal'),
+    ([f"{rng.randint(0, 40)}/{rng.randint(1, 12)}" for _ in range(CASES)], 'fractional'),
+):
+    fast = implied_probabilities(fmt_odds, fmt)
+    exact = implied_probabilities(fmt_odds, fmt, exact=True)
+    assert all(close(f, float(e)) for f, e in zip(fast, exact)), f"float/exact mismatch ({fmt})"
+    assert all(0 < e <= 100 for e in exact), f"probability out of range ({fmt})"
+    print(f"  ✅ {fmt}: {CASES} implied probabilities agree in float and exact mode")
+
+fast_over, fast_under = no_vig_probabilities(overs, unders)
+exact_over, exact_under = no_vig_probabilities(overs, unders, exact=True)
+assert all(o + u == 100 for o, u in zip(exact_over, exact_under)), "exact no-vig doesn't sum to 100"
+assert all(close(f, float(e)) for f, e in zip(fast_over, exact_over)), "no-vig float/exact mismatch"
+assert all(close(f, float(e)) for f, e in zip(fast_under, exact_under)), "no-vig float/exact mismatch"
+exact_sides = zip(implied_probabilities(overs, exact=True), implied_probabilities(unders, exact=True))
+assert overrounds(overs, unders, exact=True) == [o + u for o, u in exact_sides], "overround isn't over + under"
+print(f"  ✅ {CASES} no-vig pairs: exact mode sums to exactly 100%, float mode within {REL_TOL:g}")
+
+assert all(
+    close(scalar_over, batch_over) and close(scalar_under, batch_under)
+    for (scalar_over, scalar_under), batch_over, batch_under in zip(
+        (calculate_no_vig_probability(o, u) for o, u in zip(overs[3:], unders[3:])),
+        fast_over[3:], fast_under[3:],
+    )
+), "batch and scalar no-vig disagree"
+assert all(close(american_to_probability(o), p) for o, p in zip(unders, implied_probabilities(unders)))
+print("  ✅ Batch results match american_to_probability / calculate_no_vig_probability")
+
+# +x pays x/100 (decimal 1 + x/100); -x pays 100/x (decimal 1 + 100/x)
+whole = [rng.choice([-1, 1]) * rng.randint(100, 100000) for _ in range(CASES)]
+profit = [Fraction(o, 100) if o > 0 else Fraction(100, -o) for o in whole]
+american = implied_probabilities(whole, exact=True)
+assert american == implied_probabilities([1 + p for p in profit], 'decimal', exact=True)
+assert american == implied_probabilities(profit, 'fractional', exact=True)
+assert american == implied_probabilities([(p.numerator, p.denominator) for p in profit], 'fractional', exact=True)
+assert all(close(a, float(e)) for a, e in zip(implied_probabilities([float(1 + p) for p in profit], 'decimal'), american))
+print(f"  ✅ {CASES} equivalent American/decimal/fractional prices convert to the same probability")
+
+for bad, fmt in ((["-99"], 'american'), ([50], 'american'), ([1.0], 'decimal'), (["-1/2"], 'fractional'), ([110], 'moneyline')):
+    try:
+        implied_probabilities(bad, fmt)
+    except ValueError:
+        continue
+    raise AssertionError(f"{bad} ({fmt}) should be rejected")
+print("  ✅ Impossible prices and unknown formats raise ValueError")
+
+# Non-finite prices, alone or hidden in an otherwise valid batch (bulk and
+# lookup-table paths), are rejected the same way in float and exact mode
+NON_FINITE = {
+    'american': ["inf", "-inf", "nan", "1e999", "\u2212inf", float('inf'), float('-inf'), float('nan'), 10 ** 400],
+    'decimal': ["inf", "nan", "1e999", float('inf'), float('nan'), 10 ** 400],
+    'fractional': ["inf/1", "1/inf", "nan/2", "1e999/1", (float('inf'), 1), (1, float('nan')), float('inf')],
+}
+repeated = [rng.choice([-110, -120, 150]) for _ in range(CASES)]
+valid = {'american': (overs, repeated), 'decimal': ([rng.uniform(1.001, 50) for _ in range(CASES)],),
+         'fractional': ([f"{rng.randint(0, 40)}/{rng.randint(1, 12)}" for _ in range(CASES)],)}
+checked = 0
+for fmt, bad_prices in NON_FINITE.items():
+    for bad in bad_prices:
+        for batch in ([bad],) + tuple(
+            odds[:i] + [bad] + odds[i:] for odds in valid[fmt] for i in (rng.randrange(CASES),)
+        ):
+            for exact in (False, True):
+                try:
+                    implied_probabilities(batch, fmt, exact=exact)
+                except ValueError:
+                    checked += 1
+                    continue
+                raise AssertionError(f"{bad!r} ({fmt}, exact={exact}) should be rejected")
+print(f"  ✅ Non-finite prices raise ValueError in float and exact mode ({checked} batches)")
+
+
+# Stat names: PrizePicks and FanDuel spell the same market differently, and
+# the FanDuel scraper only keeps markets whose market_key matches exactly.
+print("\n" + "="*80)
+print("🧪 STAT NAME CHECK")
+print("="*80)
+
+SAME_MARKET = [
+    # (PrizePicks, FanDuel, other spellings)
+    ("Points", "Points", "Pts"),
+    ("Rebounds", "Rebounds", "Rebs"),
+    ("Assists", "Assists", "Asts"),
+    ("Pts+Rebs+Asts", "Points + Rebounds + Assists", "Pts + Asts + Rebs"),
+    ("Pts+Rebs", "Points + Rebounds", "Rebounds+Points"),
+    ("3-PT Made", "Made Threes", "3-Pointers Made"),
+    ("Blocked Shots", "Blocks", "Blks"),
+    ("Steals", "Steals", "Stls"),
+    ("Pass Yards", "Passing Yds", "Passing Yards"),
+    ("Pass Yds", "Passing Yards", "Pass Yards"),
+    ("Rush Yards", "Rushing Yds", "Rushing Yards"),
+    ("Receiving Yards", "Receiving Yds", "Rec Yds"),
+    ("Rush+Rec Yds", "Rushing + Receiving Yards", "Rushing+Receiving Yds"),
+    ("Pass TDs", "Passing TDs", "Passing Touchdowns"),
+    ("Pass Attempts", "Passing Attempts", "Pass Att"),
+    ("Pitcher Strikeouts", "Strikeouts", "Ks"),
+    ("Shots On Goal", "SOG", "Shots on Goal"),
+]
+for names in SAME_MARKET:
+    keys = {market_key(name, "239.5") for name in names}
+    assert len(keys) == 1, f"{names} reach different market keys: {keys}"
+assert market_key("Points", 20.5) != market_key("Pts+Rebs", 20.5), "a combo stat matched a single stat"
+assert market_key("Rush Yards", 50.5) != market_key("Rush+Rec Yds", 50.5), "a combo stat matched a single stat"
+print(f"  ✅ PrizePicks and FanDuel names of {len(SAME_MARKET)} stats reach the same market key")
+
+
+# Allocation: the per-game cap groups legs by the PrizePicks event carried
+# through the analysis, so two legs from one game share a single cap.
+print("\n" + "="*80)
+print("🧪 ALLOCATION GAME CAP CHECK")
+print("="*80)
+
+game_odds = {
+    "Player A": [{'stat': "Points", 'line': 20.5, 'over_odds': -200, 'under_odds': 160, 'event': "game-1"}],
+    "Player B": [{'stat': "Rebounds", 'line': 8.5, 'over_odds': -200, 'under_odds': 160, 'event': "game-1"}],
+}
+two_pick = {'2-Pick Power': BET_TYPES['2-Pick Power']}
+dashboard = format_opportunities_for_dashboard(find_plus_ev_opportunities(game_odds, two_pick), game_odds)
+game_entries = build_candidate_entries(dashboard['opportunities'], two_pick)
+assert [leg['event'] for leg in game_entries[0]['legs']] == ["game-1", "game-1"], "event lost before allocation"
+loose = allocate(game_entries, 100, limits={'game': 1.0}, bet_types=two_pick)
+capped = allocate(game_entries, 100, limits={'game': 0.01}, bet_types=two_pick)
+assert loose['total_stake'] > 1.0, "game cap test needs an entry worth more than the cap"
+assert capped['total_stake'] <= 1.0, f"game cap didn't bind: staked ${capped['total_stake']:.2f}"
+print(f"  ✅ Two legs from one game: ${loose['total_stake']:.2f} uncapped, ${capped['total_stake']:.2f} under a 1% game cap")